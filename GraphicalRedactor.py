@@ -3,169 +3,129 @@ from tkinter import ttk, Menu, colorchooser, Toplevel, Scale, Button, Frame, Lab
 import math
 import time
 
-def draw_line_dda(canvas, x1, y1, x2, y2, color="black", plot_pixel_func=None, collect_steps=False):
-    steps_data = []
-    if plot_pixel_func is None:
-        plot_pixel_func = lambda x, y, c: canvas.create_rectangle(x, y, x+1, y+1, fill=c, outline=c)
-
-    dx = x2 - x1
-    dy = y2 - y1
-
-    steps = max(abs(dx), abs(dy))
-    if steps == 0:
-        plot_pixel_func(round(x1), round(y1), color)
-        if collect_steps: steps_data.append((round(x1), round(y1)))
-        return steps_data
-
-    x_increment = dx / steps if steps != 0 else 0
-    y_increment = dy / steps if steps != 0 else 0
-
-    x = float(x1)
-    y = float(y1)
-
-    px_start, py_start = round(x), round(y)
-    plot_pixel_func(px_start, py_start, color)
-    if collect_steps: steps_data.append((px_start, py_start))
-
-    for i in range(int(steps)):
-        x += x_increment
-        y += y_increment
-        px, py = round(x), round(y)
-        if not steps_data or (px, py) != steps_data[-1][:2]:
-             plot_pixel_func(px, py, color)
-             if collect_steps: steps_data.append((px, py))
-
-    px_end, py_end = round(x2), round(y2)
-    if not steps_data or (px_end, py_end) != steps_data[-1][:2]:
-         plot_pixel_func(px_end, py_end, color)
-         if collect_steps: steps_data.append((px_end, py_end))
-
+from framebuffer import FrameBuffer, parse_hex_color
+from raster_core import rasterize_dda, rasterize_bresenham, rasterize_wu, WuBlendCache, pixel_clip_rect
+from polyline import fill_spans, polyline_spans
+from pixel_grid import PixelGrid
 
-    return steps_data
+def _canvas_plotter(canvas):
+    return lambda x, y, c: canvas.create_rectangle(x, y, x+1, y+1, fill=c, outline=c)
 
-def draw_line_bresenham(canvas, x1, y1, x2, y2, color="black", plot_pixel_func=None, collect_steps=False):
-    steps_data = []
+def draw_line_dda(canvas, x1, y1, x2, y2, color="black", plot_pixel_func=None, collect_steps=False, clip_rect=None,
+                  fixed_point=False):
     if plot_pixel_func is None:
-        plot_pixel_func = lambda x, y, c: canvas.create_rectangle(x, y, x+1, y+1, fill=c, outline=c)
+        plot_pixel_func = _canvas_plotter(canvas)
+    return rasterize_dda(x1, y1, x2, y2, color, plot_pixel_func, collect_steps, clip_rect, fixed_point)
 
-    x1_orig, y1_orig, x2_orig, y2_orig = x1, y1, x2, y2
+def draw_line_bresenham(canvas, x1, y1, x2, y2, color="black", plot_pixel_func=None, collect_steps=False, clip_rect=None,
+                        two_ended=False):
+    if plot_pixel_func is None:
+        plot_pixel_func = _canvas_plotter(canvas)
+    return rasterize_bresenham(x1, y1, x2, y2, color, plot_pixel_func, collect_steps, clip_rect, two_ended)
 
-    x1, y1, x2, y2 = int(round(x1)), int(round(y1)), int(round(x2)), int(round(y2))
+def draw_line_wu(canvas, x1, y1, x2, y2, color="black", plot_pixel_func_intensity=None, collect_steps=False, clip_rect=None):
+    if plot_pixel_func_intensity is None:
+        def default_plotter(x, y, intensity, base_color):
+            gray_val = int(255 * (1.0 - intensity))
+            if gray_val < 0: gray_val = 0
+            if gray_val > 255: gray_val = 255
+            hex_color = f'#{gray_val:02x}{gray_val:02x}{gray_val:02x}'
+            canvas.create_rectangle(x, y, x+1, y+1, fill=hex_color, outline=hex_color)
+        plot_pixel_func_intensity = default_plotter
+    return rasterize_wu(x1, y1, x2, y2, color, plot_pixel_func_intensity, collect_steps, clip_rect)
 
-    dx = abs(x2 - x1)
-    dy = -abs(y2 - y1)
 
-    sx = 1 if x1 < x2 else -1
-    sy = 1 if y1 < y2 else -1
+def resolve_canvas_color(canvas, color):
+    rgb = parse_hex_color(color)
+    if rgb is None:
+        r, g, b = canvas.winfo_rgb(color)
+        rgb = (r >> 8, g >> 8, b >> 8)
+    return rgb
 
-    err = dx + dy
-    x, y = x1, y1
 
-    while True:
-        if not steps_data or (x, y) != steps_data[-1][:2]:
-            plot_pixel_func(x, y, color)
-            if collect_steps: steps_data.append((x, y))
+class CanvasRasterTarget:
+    """Вывод пикселей отдельными прямоугольниками холста."""
 
-        if x == x2 and y == y2:
-            break
-        e2 = 2 * err
-        if e2 >= dy:
-            if x == x2: break
-            err += dy
-            x += sx
-        if e2 <= dx:
-            if y == y2: break
-            err += dx
-            y += sy
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.hex_cache = {}
 
-    px_end, py_end = int(round(x2_orig)), int(round(y2_orig))
-    if not steps_data or (px_end, py_end) != steps_data[-1][:2]:
-         if collect_steps: steps_data.append((px_end, py_end))
+    def plot(self, x, y, color):
+        self.canvas.create_rectangle(x, y, x+1, y+1, fill=color, outline=color, tags="line_segment")
 
-    return steps_data
+    def plot_rgb(self, x, y, rgb):
+        hex_color = self.hex_cache.get(rgb)
+        if hex_color is None:
+            hex_color = self.hex_cache[rgb] = f'#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}'
+        self.plot(x, y, hex_color)
 
+    def fill_span(self, y, x0, x1, color):
+        self.canvas.create_rectangle(x0, y, x1+1, y+1, fill=color, outline=color, tags="line_segment")
 
-def draw_line_wu(canvas, x1, y1, x2, y2, color="black", plot_pixel_func_intensity=None, collect_steps=False):
-    steps_data = []
-    if plot_pixel_func_intensity is None:
-        def default_plotter(x, y, intensity, base_color):
-            gray_val = int(255 * (1.0 - intensity))
-            if gray_val < 0: gray_val = 0
-            if gray_val > 255: gray_val = 255
-            hex_color = f'#{gray_val:02x}{gray_val:02x}{gray_val:02x}'
-            canvas.create_rectangle(x, y, x+1, y+1, fill=hex_color, outline=hex_color)
-        plot_pixel_func_intensity = default_plotter
+    def fill_spans(self, spans, color):
+        for y, x0, x1 in spans:
+            self.fill_span(y, x0, x1, color)
 
-    dx = x2 - x1
-    dy = y2 - y1
-    steep = abs(dy) > abs(dx)
+    def present(self):
+        pass
 
-    if steep:
-        x1, y1 = y1, x1
-        x2, y2 = y2, x2
-        dx, dy = dy, dx
+    def clear(self):
+        self.canvas.delete("line_segment")
 
-    if x1 > x2:
-        x1, x2 = x2, x1
-        y1, y2 = y2, y1
-        dx = -dx
-        dy = -dy
 
-    gradient = dy / dx if dx != 0 else 1.0
+class FrameBufferRasterTarget:
+    """Вывод пикселей в буфер кадра, который целиком переносится на холст одним PhotoImage."""
 
-    def ipart(x): return math.floor(x)
-    def round_coord(x): return ipart(x + 0.5)
-    def fpart(x): return x - math.floor(x)
-    def rfpart(x): return 1.0 - fpart(x)
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.framebuffer = FrameBuffer(max(1, canvas.winfo_width()), max(1, canvas.winfo_height()))
+        self.photo = tk.PhotoImage(width=self.framebuffer.width, height=self.framebuffer.height)
+        self.image_id = None
+        self.color_cache = {}
+        self._ensure_image_item()
 
-    def plot(x, y, intensity):
-        px_plot, py_plot = (int(y), int(x)) if steep else (int(x), int(y))
-        is_duplicate = False
-        if steps_data:
-            last_px, last_py, _ = steps_data[-1]
-            if px_plot == last_px and py_plot == last_py:
-                 is_duplicate = True
+    def _ensure_image_item(self):
+        if self.image_id is None or not self.canvas.find_withtag(self.image_id):
+            self.image_id = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo, tags="framebuffer")
+            self.canvas.tag_lower(self.image_id)
 
-        if not is_duplicate:
-            plot_pixel_func_intensity(px_plot, py_plot, intensity, color)
-            if collect_steps: steps_data.append((px_plot, py_plot, intensity))
+    def _rgb(self, color):
+        rgb = self.color_cache.get(color)
+        if rgb is None:
+            rgb = self.color_cache[color] = resolve_canvas_color(self.canvas, color)
+        return rgb
 
-    xend = round_coord(x1)
-    yend = y1 + gradient * (xend - x1)
-    xgap = rfpart(x1 + 0.5)
-    xpxl1 = xend
-    ypxl1 = ipart(yend)
+    def plot(self, x, y, color):
+        self.framebuffer.set_pixel(x, y, self._rgb(color))
 
-    plot(xpxl1, ypxl1, rfpart(yend) * xgap)
-    plot(xpxl1, ypxl1 + 1, fpart(yend) * xgap)
-    intery = yend + gradient
+    def plot_rgb(self, x, y, rgb):
+        self.framebuffer.set_pixel(x, y, rgb)
 
-    xend = round_coord(x2)
-    yend = y2 + gradient * (xend - x2)
-    xgap = fpart(x2 + 0.5)
-    xpxl2 = xend
-    ypxl2 = ipart(yend)
+    def fill_span(self, y, x0, x1, color):
+        self.framebuffer.fill_hspan(y, x0, x1, self._rgb(color))
 
-    plot(xpxl2, ypxl2, rfpart(yend) * xgap)
-    plot(xpxl2, ypxl2 + 1, fpart(yend) * xgap)
+    def fill_spans(self, spans, color):
+        fill_spans(self.framebuffer, spans, self._rgb(color))
 
-    for x in range(int(xpxl1 + 1), int(xpxl2)):
-        intensity1 = rfpart(intery)
-        intensity2 = fpart(intery)
-        y_coord = ipart(intery)
+    def resize(self, width, height):
+        self.framebuffer.resize(width, height)
+        self.present()
 
-        plot(x, y_coord, intensity1)
-        plot(x, y_coord + 1, intensity2)
-        intery += gradient
+    def present(self):
+        self._ensure_image_item()
+        self.framebuffer.blit(self.photo)
 
-    return steps_data
+    def clear(self):
+        self.framebuffer.clear()
+        self.present()
 
 
 class LineEditorApp:
     DEFAULT_COLOR = "black"
     DEBUG_GRID_SIZE = 20
     DEBUG_CELL_SIZE = 20
-    INITIAL_DEBUG_DELAY = 100
+    INITIAL_DEBUG_SPEED = 200
+    DEBUG_FPS = 30
 
     def __init__(self, root):
         self.root = root
@@ -181,11 +141,26 @@ class LineEditorApp:
         self.debug_steps = []
         self.debug_origin = (0, 0)
         self.debug_step_index = 0
-        self.debug_delay_ms = tk.IntVar(value=self.INITIAL_DEBUG_DELAY)
+        self.debug_grid = None
+        self.debug_photo = None
+        self.debug_cursor_id = None
+        self.debug_pan_anchor = None
+        self.debug_algorithm = None
+        self.debug_header = ""
+        self.debug_speed = tk.IntVar(value=self.INITIAL_DEBUG_SPEED)
+        self.debug_seek_var = tk.IntVar(value=0)
+        self._debug_seek_updating = False
         self.debug_after_id = None
+        self.debug_frame_time = 0.0
+        self.debug_step_budget = 0.0
+        self.use_framebuffer = tk.BooleanVar(value=True)
+        self.polyline_width = tk.IntVar(value=5)
+        self.polyline_join = tk.StringVar(value="miter")
+        self.wu_blend_cache = WuBlendCache(resolve=lambda color: resolve_canvas_color(self.canvas, color))
 
         self._setup_ui()
         self._bind_events()
+        self._set_raster_target()
 
     def _setup_ui(self):
         menubar = Menu(self.root)
@@ -193,13 +168,26 @@ class LineEditorApp:
         algo_menu = Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Отрезки", menu=algo_menu)
         algo_menu.add_radiobutton(label="ЦДА (DDA)", variable=self.current_algorithm, value="DDA")
+        algo_menu.add_radiobutton(label="ЦДА (фикс. точка 16.16)", variable=self.current_algorithm, value="DDA16")
         algo_menu.add_radiobutton(label="Брезенхем (цел.)", variable=self.current_algorithm, value="Bresenham")
+        algo_menu.add_radiobutton(label="Брезенхем (с двух концов)", variable=self.current_algorithm, value="Bresenham2")
         algo_menu.add_radiobutton(label="Ву (Wu)", variable=self.current_algorithm, value="Wu")
+        algo_menu.add_separator()
+        algo_menu.add_radiobutton(label="Толстая ломаная", variable=self.current_algorithm, value="Polyline")
+        polyline_menu = Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Ломаная", menu=polyline_menu)
+        for width in (1, 3, 5, 9, 15):
+            polyline_menu.add_radiobutton(label=f"Толщина {width}", variable=self.polyline_width, value=width)
+        polyline_menu.add_separator()
+        polyline_menu.add_radiobutton(label="Соединение: острое (miter)", variable=self.polyline_join, value="miter")
+        polyline_menu.add_radiobutton(label="Соединение: скругленное", variable=self.polyline_join, value="round")
+        polyline_menu.add_radiobutton(label="Соединение: срезанное (bevel)", variable=self.polyline_join, value="bevel")
         options_menu = Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Опции", menu=options_menu)
         options_menu.add_command(label="Выбрать цвет", command=self.choose_color)
         options_menu.add_separator()
         options_menu.add_checkbutton(label="Отладочный режим", variable=self.debug_mode, command=self.toggle_debug_window)
+        options_menu.add_checkbutton(label="Вывод через буфер кадра", variable=self.use_framebuffer, command=self._set_raster_target)
         options_menu.add_separator()
         options_menu.add_command(label="Очистить холст", command=self.clear_canvas)
         options_menu.add_command(label="Выход", command=self.root.quit)
@@ -212,6 +200,24 @@ class LineEditorApp:
 
     def _bind_events(self):
         self.canvas.bind("<Button-1>", self.on_canvas_click)
+        self.canvas.bind("<Button-3>", self.on_canvas_right_click)
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
+        self.current_algorithm.trace_add("write", lambda *args: self._reset_pending_points())
+
+    def _reset_pending_points(self):
+        self.points = []
+        self.canvas.delete("marker")
+
+    def _set_raster_target(self):
+        if self.use_framebuffer.get():
+            self.raster_target = FrameBufferRasterTarget(self.canvas)
+        else:
+            self.canvas.delete("framebuffer")
+            self.raster_target = CanvasRasterTarget(self.canvas)
+
+    def on_canvas_resize(self, event):
+        if isinstance(self.raster_target, FrameBufferRasterTarget):
+            self.raster_target.resize(event.width, event.height)
 
     def choose_color(self):
         color_code = colorchooser.askcolor(title="Выберите цвет отрезка")
@@ -223,6 +229,11 @@ class LineEditorApp:
         x, y = event.x, event.y
         self.points.append((x, y))
 
+        if self.current_algorithm.get() == "Polyline":
+            self.canvas.create_oval(x-2, y-2, x+2, y+2, fill=self.current_color, outline=self.current_color, tags="marker")
+            self.status_bar.config(text=f"Ломаная: вершин {len(self.points)}. Правая кнопка мыши - завершить.")
+            return
+
         if len(self.points) == 1:
             self.canvas.create_oval(x-2, y-2, x+2, y+2, fill=self.current_color, outline=self.current_color, tags="marker")
             self.status_bar.config(text=f"Первая точка: ({x},{y}). Выберите вторую точку.")
@@ -232,6 +243,21 @@ class LineEditorApp:
             self.points = []
             self.status_bar.config(text="Отрезок построен. Выберите первую точку нового отрезка.")
 
+    def on_canvas_right_click(self, event):
+        if self.current_algorithm.get() != "Polyline":
+            return
+        self.canvas.delete("marker")
+        self.draw_polyline()
+        self.points = []
+        self.status_bar.config(text="Ломаная построена. Выберите первую вершину новой ломаной.")
+
+    def draw_polyline(self):
+        if len(self.points) < 2:
+            return
+        spans = polyline_spans(self.points, self.polyline_width.get(), self.polyline_join.get())
+        self.raster_target.fill_spans(spans, self.current_color)
+        self.raster_target.present()
+
     def draw_line(self):
         if len(self.points) != 2:
             return
@@ -240,56 +266,60 @@ class LineEditorApp:
         x2, y2 = self.points[1]
         algo = self.current_algorithm.get()
         collect_for_debug = self.debug_mode.get()
+        clip_rect = pixel_clip_rect(self.canvas.winfo_width(), self.canvas.winfo_height(), algo)
 
         def plot_pixel_wu_intensity(px, py, intensity, base_color):
             try:
-                r_base, g_base, b_base = self.canvas.winfo_rgb(base_color)
-                r_base, g_base, b_base = r_base/256, g_base/256, b_base/256
-                r = int(r_base * intensity + 255 * (1 - intensity))
-                g = int(g_base * intensity + 255 * (1 - intensity))
-                b = int(b_base * intensity + 255 * (1 - intensity))
-                r, g, b = max(0, min(255, r)), max(0, min(255, g)), max(0, min(255, b))
-                hex_color = f'#{r:02x}{g:02x}{b:02x}'
-                self.canvas.create_rectangle(px, py, px+1, py+1, fill=hex_color, outline=hex_color, tags="line_segment")
+                self.raster_target.plot_rgb(px, py, self.wu_blend_cache.lookup(base_color, intensity))
             except Exception:
                 gray_val = int(255 * intensity)
-                hex_color = f'#{gray_val:02x}{gray_val:02x}{gray_val:02x}'
-                self.canvas.create_rectangle(px, py, px+1, py+1, fill=hex_color, outline=hex_color, tags="line_segment")
+                self.raster_target.plot_rgb(px, py, (gray_val, gray_val, gray_val))
 
         def plot_pixel_standard(px, py, color):
-            self.canvas.create_rectangle(px, py, px+1, py+1, fill=color, outline=color, tags="line_segment")
+            self.raster_target.plot(px, py, color)
 
         self.debug_steps = []
-        if algo == "DDA":
+        if algo in ("DDA", "DDA16"):
             self.debug_steps = draw_line_dda(self.canvas, x1, y1, x2, y2, self.current_color,
                                              plot_pixel_func=plot_pixel_standard,
-                                             collect_steps=collect_for_debug)
-        elif algo == "Bresenham":
+                                             collect_steps=collect_for_debug, clip_rect=clip_rect,
+                                             fixed_point=(algo == "DDA16"))
+        elif algo in ("Bresenham", "Bresenham2"):
             self.debug_steps = draw_line_bresenham(self.canvas, x1, y1, x2, y2, self.current_color,
                                                  plot_pixel_func=plot_pixel_standard,
-                                                 collect_steps=collect_for_debug)
+                                                 collect_steps=collect_for_debug, clip_rect=clip_rect,
+                                                 two_ended=(algo == "Bresenham2"))
         elif algo == "Wu":
             self.debug_steps = draw_line_wu(self.canvas, x1, y1, x2, y2, self.current_color,
                                              plot_pixel_func_intensity=plot_pixel_wu_intensity,
-                                             collect_steps=collect_for_debug)
+                                             collect_steps=collect_for_debug, clip_rect=clip_rect)
+        self.raster_target.present()
 
         if collect_for_debug and self.debug_window and self.debug_canvas:
             self.debug_origin = (int(round(x1)), int(round(y1)))
+            self.debug_algorithm = algo
             self.stop_debug_visualization()
-            self.debug_canvas.delete("steps")
-            self.debug_info_label.config(text=f"Алгоритм: {algo}. Начало: ({int(round(x1))},{int(round(y1))}). Шагов: {len(self.debug_steps)}")
+            self.debug_grid.clear_cells()
+            self.debug_grid.axes = self.debug_origin
+            self.debug_grid.center_on(*self.debug_origin)
+            self.debug_step_index = 0
+            self.debug_header = f"Алгоритм: {algo}. Начало: ({int(round(x1))},{int(round(y1))})."
+            self.draw_debug_grid()
+            self._update_debug_progress()
 
     def clear_canvas(self):
         self.canvas.delete("all")
+        self.raster_target.clear()
         self.points = []
         self.status_bar.config(text="Холст очищен. Выберите первую точку отрезка.")
 
         if self.debug_mode.get() and self.debug_canvas:
             self.stop_debug_visualization()
-            self.debug_canvas.delete("all")
-            self.draw_debug_grid()
+            self.debug_grid.clear_cells()
             self.debug_steps = []
             self.debug_step_index = 0
+            self.draw_debug_grid()
+            self._update_debug_progress()
             self.debug_info_label.config(text="Сетка для отладки. Нарисуйте отрезок.")
 
 
@@ -315,8 +345,20 @@ class LineEditorApp:
 
         canvas_width = self.DEBUG_GRID_SIZE * self.DEBUG_CELL_SIZE
         canvas_height = self.DEBUG_GRID_SIZE * self.DEBUG_CELL_SIZE
-        self.debug_canvas = tk.Canvas(self.debug_window, width=canvas_width, height=canvas_height, bg="lightgrey")
+        self.debug_canvas = tk.Canvas(self.debug_window, width=canvas_width, height=canvas_height, bg="lightgrey",
+                                      highlightthickness=0)
         self.debug_canvas.pack(pady=10, padx=10)
+        self.debug_grid = PixelGrid(canvas_width, canvas_height, cell_size=self.DEBUG_CELL_SIZE)
+        self.debug_grid.axes = self.debug_origin
+        self.debug_grid.center_on(*self.debug_origin)
+        self.debug_photo = tk.PhotoImage(width=canvas_width, height=canvas_height)
+        self.debug_canvas.create_image(0, 0, anchor=tk.NW, image=self.debug_photo)
+        self.debug_cursor_id = self.debug_canvas.create_rectangle(0, 0, 0, 0, outline="blue", width=2, state=tk.HIDDEN)
+        self.debug_canvas.bind("<MouseWheel>", self._on_debug_zoom)
+        self.debug_canvas.bind("<Button-4>", self._on_debug_zoom)
+        self.debug_canvas.bind("<Button-5>", self._on_debug_zoom)
+        self.debug_canvas.bind("<ButtonPress-1>", self._on_debug_pan_start)
+        self.debug_canvas.bind("<B1-Motion>", self._on_debug_pan)
         self.draw_debug_grid()
 
         controls_frame = Frame(self.debug_window)
@@ -325,13 +367,28 @@ class LineEditorApp:
         start_button = Button(controls_frame, text="Старт/Перезапуск", command=self.start_debug_visualization)
         start_button.pack(side=tk.LEFT, padx=5)
 
-        stop_button = Button(controls_frame, text="Стоп", command=self.stop_debug_visualization)
-        stop_button.pack(side=tk.LEFT, padx=5)
-
-        delay_label = Label(controls_frame, text="Задержка (мс):")
-        delay_label.pack(side=tk.LEFT, padx=(15, 5))
-        delay_scale = Scale(controls_frame, from_=10, to=1000, orient=tk.HORIZONTAL, variable=self.debug_delay_ms, length=150)
-        delay_scale.pack(side=tk.LEFT)
+        pause_button = Button(controls_frame, text="Пауза/Продолжить", command=self.toggle_debug_pause)
+        pause_button.pack(side=tk.LEFT, padx=5)
+
+        back_button = Button(controls_frame, text="<", width=2, command=lambda: self.step_debug(-1))
+        back_button.pack(side=tk.LEFT, padx=(10, 0))
+        forward_button = Button(controls_frame, text=">", width=2, command=lambda: self.step_debug(1))
+        forward_button.pack(side=tk.LEFT)
+
+        speed_frame = Frame(self.debug_window)
+        speed_frame.pack(fill=tk.X, padx=10)
+        speed_label = Label(speed_frame, text="Шагов в секунду:")
+        speed_label.pack(side=tk.LEFT, padx=(5, 5))
+        speed_scale = Scale(speed_frame, from_=1, to=2000, orient=tk.HORIZONTAL, variable=self.debug_speed, length=250)
+        speed_scale.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        seek_frame = Frame(self.debug_window)
+        seek_frame.pack(fill=tk.X, padx=10)
+        seek_label = Label(seek_frame, text="Шаг:")
+        seek_label.pack(side=tk.LEFT, padx=(5, 5))
+        self.debug_seek_scale = Scale(seek_frame, from_=0, to=max(len(self.debug_steps), 1), orient=tk.HORIZONTAL,
+                                      variable=self.debug_seek_var, command=self._on_debug_seek_scale, length=250)
+        self.debug_seek_scale.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
     def _on_debug_close(self):
         self.stop_debug_visualization()
@@ -339,19 +396,31 @@ class LineEditorApp:
         self.debug_window.withdraw()
 
     def draw_debug_grid(self):
+        """Переносит кадр сетки в PhotoImage и ставит рамку на пиксель текущего шага."""
         if not self.debug_canvas: return
-        self.debug_canvas.delete("grid")
-        w = self.DEBUG_GRID_SIZE * self.DEBUG_CELL_SIZE
-        h = self.DEBUG_GRID_SIZE * self.DEBUG_CELL_SIZE
-        cs = self.DEBUG_CELL_SIZE
-        for i in range(0, w + 1, cs):
-            self.debug_canvas.create_line(i, 0, i, h, fill="grey", tags="grid")
-        for i in range(0, h + 1, cs):
-            self.debug_canvas.create_line(0, i, w, i, fill="grey", tags="grid")
-        center_x = (self.DEBUG_GRID_SIZE // 2) * cs
-        center_y = (self.DEBUG_GRID_SIZE // 2) * cs
-        self.debug_canvas.create_line(center_x - cs//2, center_y, center_x + cs//2, center_y, fill="red", width=2, tags="grid")
-        self.debug_canvas.create_line(center_x, center_y - cs//2, center_x, center_y + cs//2, fill="red", width=2, tags="grid")
+        self.debug_grid.render().blit(self.debug_photo)
+        if 0 < self.debug_step_index <= len(self.debug_steps):
+            px, py = self.debug_steps[self.debug_step_index - 1][:2]
+            x0, y0 = self.debug_grid.to_screen(px, py)
+            cs = self.debug_grid.cell_size
+            self.debug_canvas.coords(self.debug_cursor_id, x0, y0, x0 + cs, y0 + cs)
+            self.debug_canvas.itemconfig(self.debug_cursor_id, state=tk.NORMAL)
+        else:
+            self.debug_canvas.itemconfig(self.debug_cursor_id, state=tk.HIDDEN)
+
+    def _on_debug_zoom(self, event):
+        zoom_in = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.debug_grid.zoom_at(2.0 if zoom_in else 0.5, event.x, event.y)
+        self.draw_debug_grid()
+
+    def _on_debug_pan_start(self, event):
+        self.debug_pan_anchor = (event.x, event.y)
+
+    def _on_debug_pan(self, event):
+        ax, ay = self.debug_pan_anchor
+        self.debug_grid.pan(event.x - ax, event.y - ay)
+        self.debug_pan_anchor = (event.x, event.y)
+        self.draw_debug_grid()
 
     def start_debug_visualization(self):
         if not self.debug_canvas or not self.debug_steps:
@@ -359,10 +428,9 @@ class LineEditorApp:
             return
 
         self.stop_debug_visualization()
-        self.debug_canvas.delete("steps")
-        self.debug_step_index = 0
-        print(f"Debug: Starting visualization with {len(self.debug_steps)} steps, delay={self.debug_delay_ms.get()}ms")
-        self._draw_debug_step_delayed()
+        self.seek_debug(0)
+        print(f"Debug: Starting visualization with {len(self.debug_steps)} steps, speed={self.debug_speed.get()} steps/s")
+        self._resume_debug_playback()
 
     def stop_debug_visualization(self):
         if self.debug_after_id:
@@ -370,56 +438,88 @@ class LineEditorApp:
             self.debug_after_id = None
             print("Debug: Visualization stopped.")
 
-    def _draw_debug_step_delayed(self):
+    def toggle_debug_pause(self):
+        if self.debug_after_id:
+            self.stop_debug_visualization()
+        elif self.debug_steps and self.debug_step_index < len(self.debug_steps):
+            self._resume_debug_playback()
+
+    def step_debug(self, delta):
+        self.stop_debug_visualization()
+        self.seek_debug(self.debug_step_index + delta)
+
+    def _resume_debug_playback(self):
+        self.debug_frame_time = time.perf_counter()
+        self.debug_step_budget = 0.0
+        self.debug_after_id = self.debug_canvas.after(1000 // self.DEBUG_FPS, self._debug_playback_frame)
+
+    def _debug_playback_frame(self):
+        # за кадр показываем столько шагов, сколько набежало по заданной скорости
+        now = time.perf_counter()
+        self.debug_step_budget += (now - self.debug_frame_time) * self.debug_speed.get()
+        self.debug_frame_time = now
+        steps_now = int(self.debug_step_budget)
+        self.debug_step_budget -= steps_now
+        if steps_now:
+            self.seek_debug(self.debug_step_index + steps_now)
+
         if not self.debug_canvas or self.debug_step_index >= len(self.debug_steps):
             self.debug_after_id = None
             print("Debug: Visualization finished.")
-            if self.debug_info_label:
-                 self.debug_info_label.config(text=self.debug_info_label.cget("text").split(".")[0] + f". Шагов: {len(self.debug_steps)}. Завершено.")
             return
+        self.debug_after_id = self.debug_canvas.after(1000 // self.DEBUG_FPS, self._debug_playback_frame)
 
-        step_data = self.debug_steps[self.debug_step_index]
-        algo = self.current_algorithm.get()
-        intensity = 1.0
+    def _on_debug_seek_scale(self, value):
+        if self._debug_seek_updating:
+            return
+        self.stop_debug_visualization()
+        self.seek_debug(int(float(value)))
+
+    def seek_debug(self, target):
+        """Показывает первые target шагов: вперёд ячейки дорисовываются, назад сетка собирается заново."""
+        if not self.debug_canvas:
+            return
+        target = max(0, min(target, len(self.debug_steps)))
+        if target < self.debug_step_index:
+            self.debug_grid.clear_cells()
+            start = 0
+        else:
+            start = self.debug_step_index
+        for index in range(start, target):
+            cell = self._debug_step_cell(index)
+            if cell:
+                self.debug_grid.set_cell(*cell)
+        self.debug_step_index = target
+        self.draw_debug_grid()
+        self._update_debug_progress()
+
+    def _update_debug_progress(self):
+        total = len(self.debug_steps)
+        self._debug_seek_updating = True
+        try:
+            self.debug_seek_scale.config(to=max(total, 1))
+            self.debug_seek_var.set(self.debug_step_index)
+        finally:
+            self._debug_seek_updating = False
+        status = "Завершено." if total and self.debug_step_index >= total else ""
+        text = f"{self.debug_header} Шаг {self.debug_step_index}/{total}. {status}"
+        if 0 < self.debug_step_index <= total:
+            text += f"\nТекущий пиксель: {self.debug_steps[self.debug_step_index - 1][:2]}"
+        self.debug_info_label.config(text=text)
+
+    def _debug_step_cell(self, index):
+        """(x, y, rgb) ячейки для шага index или None для неверных данных."""
+        step_data = self.debug_steps[index]
+        algo = self.debug_algorithm
         if algo == "Wu" and len(step_data) == 3:
             px, py, intensity = step_data
-        elif len(step_data) == 2:
+            gray_val = int(255 * (1.0 - intensity))
+            return px, py, (gray_val, gray_val, gray_val)
+        if len(step_data) == 2:
             px, py = step_data
-        else:
-            print(f"Debug: Invalid step data format at index {self.debug_step_index}: {step_data}")
-            self.debug_step_index += 1
-            self.debug_after_id = self.debug_canvas.after(self.debug_delay_ms.get(), self._draw_debug_step_delayed) # Schedule next
-            return
-
-        cs = self.DEBUG_CELL_SIZE
-        grid_center_offset_x = self.DEBUG_GRID_SIZE // 2
-        grid_center_offset_y = self.DEBUG_GRID_SIZE // 2
-        origin_x, origin_y = self.debug_origin
-        grid_x = (px - origin_x) + grid_center_offset_x
-        grid_y = (py - origin_y) + grid_center_offset_y
-
-        if 0 <= grid_x < self.DEBUG_GRID_SIZE and 0 <= grid_y < self.DEBUG_GRID_SIZE:
-            cell_x1 = grid_x * cs
-            cell_y1 = grid_y * cs
-            cell_x2 = cell_x1 + cs
-            cell_y2 = cell_y1 + cs
-
-            if algo == "Wu":
-                gray_val = int(255 * (1.0 - intensity))
-                fill_color = f'#{gray_val:02x}{gray_val:02x}{gray_val:02x}'
-                outline_color = "darkred" if intensity > 0.8 else "red"
-            else:
-                fill_color = "lightblue"
-                outline_color = "blue"
-
-            self.debug_canvas.create_rectangle(cell_x1, cell_y1, cell_x2, cell_y2,
-                                               fill=fill_color, outline=outline_color, width=1, tags="steps")
-            self.debug_canvas.create_text(cell_x1 + cs//2, cell_y1 + cs//2,
-                                           text=str(self.debug_step_index + 1), fill="black", tags="steps", font=("Arial", 7))
-
-
-        self.debug_step_index += 1
-        self.debug_after_id = self.debug_canvas.after(self.debug_delay_ms.get(), self._draw_debug_step_delayed)
+            return px, py, (173, 216, 230)
+        print(f"Debug: Invalid step data format at index {index}: {step_data}")
+        return None
 
 
 if __name__ == "__main__":
@@ -1,167 +1,248 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, Toplevel
+from tkinter import ttk, messagebox, Toplevel, filedialog, simpledialog
 import math
 import time
+from collections import OrderedDict
+
+import numpy as np
+
+from conic_scene import ConicScene, POINTS_PER_KIND
+from pixel_grid import PixelGrid
+
+NO_POINTS = np.empty((0, 2), dtype=int)
+
+def _drop_repeats(points):
+    """Убирает подряд идущие совпадающие точки массива (N, 2)."""
+    if len(points) < 2:
+        return points
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = np.any(points[1:] != points[:-1], axis=1)
+    return points[keep]
+
+def _round_points(xs, ys):
+    # округление половин вверх, а не к чётному: результат не меняется при целочисленном сдвиге
+    return _drop_repeats(np.floor(np.column_stack((xs, ys)) + 0.5).astype(int))
 
 def calculate_circle_points(cx, cy, r):
-    points = []
-    if r < 1: return points
+    if r < 1: return NO_POINTS
     steps = max(8, int(2 * math.pi * r / 1.5))
-    for i in range(steps + 1):
-        t = 2 * math.pi * i / steps
-        x = cx + r * math.cos(t)
-        y = cy + r * math.sin(t)
-        point = (round(x), round(y))
-        if not points or point != points[-1]:
-             points.append(point)
-    return points
+    t = 2 * math.pi * np.arange(steps + 1) / steps
+    return _round_points(cx + r * np.cos(t), cy + r * np.sin(t))
 
 def calculate_ellipse_points(cx, cy, rx, ry):
-    points = []
-    if rx < 1 or ry < 1: return points
+    if rx < 1 or ry < 1: return NO_POINTS
     steps = max(8, int(math.pi * (1.5 * (rx + ry) - math.sqrt(rx * ry)) / 1.5))
-    for i in range(steps + 1):
-        t = 2 * math.pi * i / steps
-        x = cx + rx * math.cos(t)
-        y = cy + ry * math.sin(t)
-        point = (round(x), round(y))
-        if not points or point != points[-1]:
-            points.append(point)
-    return points
-
-def calculate_parabola_points(vx, vy, px, py):
-    points = []
+    t = 2 * math.pi * np.arange(steps + 1) / steps
+    return _round_points(cx + rx * np.cos(t), cy + ry * np.sin(t))
+
+def _close_contour(cx, cy, arcs):
+    points = _drop_repeats(np.concatenate([np.array(arc, dtype=int).reshape(-1, 2) for arc in arcs]))
+    if len(points) and np.any(points[-1] != points[0]):
+        points = np.vstack((points, points[:1]))
+    return points + (cx, cy)
+
+def calculate_circle_points_midpoint(cx, cy, r):
+    r = int(round(r))
+    if r < 1: return NO_POINTS
+    octant = []
+    x, y = 0, r
+    d = 1 - r
+    while x <= y:
+        octant.append((x, y))
+        if d < 0:
+            d += 2 * x + 3
+        else:
+            d += 2 * (x - y) + 5
+            y -= 1
+        x += 1
+    back = octant[::-1]
+    return _close_contour(cx, cy, [
+        octant,
+        [(y, x) for x, y in back],
+        [(y, -x) for x, y in octant],
+        [(x, -y) for x, y in back],
+        [(-x, -y) for x, y in octant],
+        [(-y, -x) for x, y in back],
+        [(-y, x) for x, y in octant],
+        [(-x, y) for x, y in back],
+    ])
+
+def calculate_ellipse_points_midpoint(cx, cy, rx, ry):
+    rx, ry = int(round(rx)), int(round(ry))
+    if rx < 1 or ry < 1: return NO_POINTS
+    rx2, ry2 = rx * rx, ry * ry
+    quadrant = []
+    x, y = 0, ry
+    dx, dy = 0, 2 * rx2 * y
+    d1 = 4 * ry2 - 4 * rx2 * ry + rx2
+    while dx < dy:
+        quadrant.append((x, y))
+        x += 1
+        dx += 2 * ry2
+        if d1 < 0:
+            d1 += 4 * (dx + ry2)
+        else:
+            y -= 1
+            dy -= 2 * rx2
+            d1 += 4 * (dx - dy + ry2)
+
+    d2 = ry2 * (2 * x + 1) ** 2 + 4 * rx2 * (y - 1) ** 2 - 4 * rx2 * ry2
+    while y >= 0:
+        quadrant.append((x, y))
+        y -= 1
+        dy -= 2 * rx2
+        if d2 > 0:
+            d2 += 4 * (rx2 - dy)
+        else:
+            x += 1
+            dx += 2 * ry2
+            d2 += 4 * (dx - dy + rx2)
+    back = quadrant[::-1]
+    return _close_contour(cx, cy, [
+        quadrant,
+        [(x, -y) for x, y in back],
+        [(-x, -y) for x, y in quadrant],
+        [(-x, y) for x, y in back],
+    ])
+
+# длина дуги между соседними отсчётами, px: каждая координата меняется меньше чем на пиксель,
+# поэтому после округления соседние точки не расходятся больше чем на один пиксель
+SAMPLE_STEP = 0.9
+
+# по умолчанию параболы и гиперболы строятся не дальше этого числа пикселей от вершины (центра)
+# по каждой оси; редактор передаёт вместо него размер холста
+CONIC_EXTENT = 2048
+
+def _uniform(start, stop):
+    """Равномерные отсчёты от start до stop включительно с шагом не больше SAMPLE_STEP."""
+    return np.linspace(start, stop, int(math.ceil(abs(stop - start) / SAMPLE_STEP)) + 1)
+
+def _parabola_offsets(k, half_range):
+    """Отсчёты u на [-half_range, half_range] для v = k*u^2 с шагом не больше SAMPLE_STEP по каждой оси.
+
+    Где |v'| <= 1, шаг делается по u, дальше - по v (u = sqrt(v/k)), как в двух
+    областях алгоритма средней точки.
+    """
+    k = abs(k)
+    u0 = min(half_range, 0.5 / k) if k else half_range
+    outer = np.sqrt(_uniform(k * u0 * u0, k * half_range * half_range)[1:] / k)
+    return np.concatenate((-outer[::-1], _uniform(-u0, u0), outer))
+
+def _hyperbola_offsets(a, b, limit, v_limit):
+    """Отсчёты (u, v) ветви u^2/a^2 - v^2/b^2 = 1 от вершины до u = limit или v = v_limit с шагом не больше SAMPLE_STEP по каждой оси.
+
+    У вершины ветвь крутая и шаг делается по v; начиная с точки, где наклон равен 1
+    (th(t) = b/a), - по u.
+    """
+    t_end = min(math.acosh(max(1.0, limit / a)), math.asinh(v_limit / b))
+    t1 = math.atanh(b / a) if b < a else t_end
+    t1 = min(t1, t_end)
+    v_steep = _uniform(0.0, b * math.sinh(t1))
+    u_flat = _uniform(a * math.cosh(t1), a * math.cosh(t_end))[1:]
+    u = np.concatenate((a * np.sqrt(1 + (v_steep / b) ** 2), u_flat))
+    v = np.concatenate((v_steep, b * np.sqrt(np.maximum(0.0, (u_flat / a) ** 2 - 1))))
+    return u, v
+
+def _parabola_half_range(k, span, extent):
+    """Полуширина [-u, u] для v = k*u^2: 2.5*span, но не дальше extent от вершины ни по u, ни по v."""
+    half_range = min(2.5 * span, extent)
+    if k:
+        half_range = min(half_range, math.sqrt(extent / abs(k)))
+    return half_range
+
+def calculate_parabola_points(vx, vy, px, py, extent=CONIC_EXTENT):
     dx = px - vx
     dy = py - vy
 
     if abs(dx) < 1e-6:
-        if abs(dy) < 1e-6: return []
+        if abs(dy) < 1e-6: return NO_POINTS
         k = dx / (dy**2)
-        y_range = 2.5 * abs(dy)
-        steps = 100
-        for i in range(steps + 1):
-            delta_y = -y_range + (2 * y_range * i / steps)
-            y = vy + delta_y
-            x = vx + k * (delta_y**2)
-            point = (round(x), round(y))
-            if not points or point != points[-1]:
-                points.append(point)
-        points.sort(key=lambda p: p[1])
+        delta_y = _parabola_offsets(k, _parabola_half_range(k, abs(dy), extent))
+        return _round_points(vx + k * delta_y**2, vy + delta_y)
+
+    k = dy / (dx**2)
+    delta_x = _parabola_offsets(k, _parabola_half_range(k, abs(dx), extent))
+    return _round_points(vx + delta_x, vy + k * delta_x**2)
 
-    else:
-        if abs(dx) < 1e-6: return []
-        k = dy / (dx**2)
-        x_range = 2.5 * abs(dx)
-        steps = 100
-        for i in range(steps + 1):
-            delta_x = -x_range + (2 * x_range * i / steps)
-            x = vx + delta_x
-            y = vy + k * (delta_x**2)
-            point = (round(x), round(y))
-            if not points or point != points[-1]:
-                points.append(point)
-        points.sort(key=lambda p: p[0])
-
-    return points
-
-
-def calculate_hyperbola_points(cx, cy, ax, ay, bx, by):
-    points_branch1 = []
-    points_branch2 = []
 
+def calculate_hyperbola_points(cx, cy, ax, ay, bx, by, extent=CONIC_EXTENT):
     dx_a = ax - cx
     dy_a = ay - cy
     dx_b = bx - cx
     dy_b = by - cy
 
     is_horizontal = abs(dx_a) >= abs(dy_a)
-
     if is_horizontal:
-        a = abs(dx_a)
-        if a < 1: return [], []
-        if abs(dx_b) > 1e-6:
-            b = abs(a * dy_b / dx_b)
+        a, along_b, across_b = abs(dx_a), dx_b, dy_b
+    else:
+        a, along_b, across_b = abs(dy_a), dy_b, dx_b
+    if a < 1: return NO_POINTS, NO_POINTS
+    if abs(along_b) > 1e-6:
+        b = abs(a * across_b / along_b)
+    else:
+        b = abs(across_b)
+    if b < 1: b = a
+
+    # при крутой асимптоте (b >> a) ветвь до u = 3a уходила бы далеко за холст
+    u, v = _hyperbola_offsets(a, b, min(a * 3, extent), extent)
+    # ветвь целиком: от дальнего конца с отрицательным v через вершину к положительному
+    along = np.concatenate((u[::-1], u))
+    across = np.concatenate((-v[::-1], v))
+
+    branches = []
+    for branch in [1, -1]:
+        if is_horizontal:
+            branches.append(_round_points(cx + branch * along, cy + across))
         else:
-             b = abs(dy_b)
-
-        if b < 1: b = a
-
-        x_limit = a * 3
-        steps = 100
-
-        for branch in [1, -1]:
-            current_branch_points_pos_y = []
-            current_branch_points_neg_y = []
-            for i in range(steps + 1):
-                 x_rel = a + (x_limit - a) * i / steps
-                 x = cx + branch * x_rel
-                 try:
-                     radicand = (x_rel**2 / a**2) - 1
-                     if radicand >= 0:
-                         delta_y = b * math.sqrt(radicand)
-                         py = round(cy + delta_y)
-                         ny = round(cy - delta_y)
-                         pt_p = (round(x), py)
-                         pt_n = (round(x), ny)
-                         if not current_branch_points_pos_y or pt_p != current_branch_points_pos_y[-1]:
-                              current_branch_points_pos_y.append(pt_p)
-                         if not current_branch_points_neg_y or pt_n != current_branch_points_neg_y[-1]:
-                              current_branch_points_neg_y.append(pt_n)
-                 except ValueError:
-                     pass
-
-            if branch == 1:
-                 points_branch1.extend(list(reversed(current_branch_points_neg_y)))
-                 points_branch1.extend(current_branch_points_pos_y)
-            else:
-                 points_branch2.extend(list(reversed(current_branch_points_neg_y)))
-                 points_branch2.extend(current_branch_points_pos_y)
+            branches.append(_round_points(cx + across, cy + branch * along))
+    return branches[0], branches[1]
 
-    else:
-        a = abs(dy_a)
-        if a < 1: return [], []
-        if abs(dy_b) > 1e-6:
-             b = abs(a * dx_b / dy_b)
+
+# режим инструмента -> (окружность, эллипс)
+CONIC_MODES = {
+    "Parametric": (calculate_circle_points, calculate_ellipse_points),
+    "Midpoint": (calculate_circle_points_midpoint, calculate_ellipse_points_midpoint),
+}
+
+# параметры кривых квантуются с шагом 1/CONIC_QUANTUM пикселя перед поиском в кэше
+CONIC_QUANTUM = 8
+CONIC_EXTENT_STEP = 256
+
+
+class ConicCache:
+    """LRU-кэш точек кривых, построенных с центром (вершиной) в начале координат.
+
+    Ключ - имя функции построения и квантованные параметры относительно центра,
+    поэтому одинаковые фигуры в разных местах холста строятся один раз: копия
+    получается целочисленным сдвигом шаблона, который точен.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.templates = OrderedDict()
+
+    def points(self, calculate, center, *params):
+        """calculate(0, 0, *params), сдвинутые в center; для гиперболы - пара ветвей."""
+        key = (calculate.__name__,) + tuple(round(p * CONIC_QUANTUM) for p in params)
+        template = self.templates.get(key)
+        if template is not None:
+            self.templates.move_to_end(key)
         else:
-             b = abs(dx_b)
-
-        if b < 1: b = a
-
-        y_limit = a * 3
-        steps = 100
-
-        for branch in [1, -1]:
-             current_branch_points_pos_x = []
-             current_branch_points_neg_x = []
-             for i in range(steps + 1):
-                 y_rel = a + (y_limit - a) * i / steps
-                 y = cy + branch * y_rel
-                 try:
-                     radicand = (y_rel**2 / a**2) - 1
-                     if radicand >= 0:
-                         delta_x = b * math.sqrt(radicand)
-                         px = round(cx + delta_x)
-                         nx = round(cx - delta_x)
-                         pt_p = (px, round(y))
-                         pt_n = (nx, round(y))
-                         if not current_branch_points_pos_x or pt_p != current_branch_points_pos_x[-1]:
-                              current_branch_points_pos_x.append(pt_p)
-                         if not current_branch_points_neg_x or pt_n != current_branch_points_neg_x[-1]:
-                              current_branch_points_neg_x.append(pt_n)
-                 except ValueError:
-                     pass
-
-             if branch == 1:
-                 points_branch1.extend(list(reversed(current_branch_points_neg_x)))
-                 points_branch1.extend(current_branch_points_pos_x)
-             else:
-                 points_branch2.extend(list(reversed(current_branch_points_neg_x)))
-                 points_branch2.extend(current_branch_points_pos_x)
-
-    return points_branch1, points_branch2
+            template = calculate(0, 0, *(q / CONIC_QUANTUM for q in key[1:]))
+            self.templates[key] = template
+            if len(self.templates) > self.max_entries:
+                self.templates.popitem(last=False)
+        if isinstance(template, tuple):
+            return tuple(branch + center for branch in template)
+        return template + center
+
+    def clear(self):
+        self.templates.clear()
 
 
 class GraphicalEditor:
+    PREVIEW_FPS = 60
+
     def __init__(self, master):
         self.master = master
         self.master.title("Элементарный Графический Редактор")
@@ -171,13 +252,26 @@ class GraphicalEditor:
         self.click_points = []
         self.drawn_objects_ids = []
         self.temp_feedback_items = []
+        self.conic_mode = tk.StringVar(value="Parametric")
+        self.conic_cache = ConicCache()
+        self.scene = ConicScene()
+
+        self.preview_items = []
+        self.preview_cursor = None
+        self.preview_after_id = None
+        self.preview_unit_circles = {}
 
         self.debug_mode = tk.BooleanVar(value=False)
         self.debug_window = None
         self.debug_canvas = None
-        self.debug_grid_step = 20
-        self.debug_pixel_size = 5
+        self.debug_grid = None
+        self.debug_photo = None
+        self.debug_cursor_id = None
+        self.debug_pan_anchor = None
+        self.debug_after_id = None
         self.debug_delay_ms = 30
+        # на сколько шагов растягивается показ кривой: длинные кривые идут пачками
+        self.debug_max_frames = 200
 
         self.setup_menu()
         self.setup_toolbar()
@@ -196,6 +290,10 @@ class GraphicalEditor:
         menubar.add_cascade(label="Файл", menu=file_menu)
         file_menu.add_command(label="Очистить холст", command=self.clear_canvas)
         file_menu.add_separator()
+        file_menu.add_command(label="Открыть сцену...", command=self.open_scene)
+        file_menu.add_command(label="Сохранить сцену...", command=self.save_scene)
+        file_menu.add_command(label="Перестроить в масштабе...", command=self.rescale_scene)
+        file_menu.add_separator()
         file_menu.add_command(label="Выход", command=self.master.quit)
 
         curves_menu = tk.Menu(menubar, tearoff=0)
@@ -204,6 +302,9 @@ class GraphicalEditor:
         curves_menu.add_command(label="Эллипс", command=lambda: self.set_tool("Ellipse"))
         curves_menu.add_command(label="Парабола", command=lambda: self.set_tool("Parabola"))
         curves_menu.add_command(label="Гипербола", command=lambda: self.set_tool("Hyperbola"))
+        curves_menu.add_separator()
+        curves_menu.add_radiobutton(label="Окружность/эллипс: параметрически", variable=self.conic_mode, value="Parametric")
+        curves_menu.add_radiobutton(label="Окружность/эллипс: Брезенхем (средняя точка)", variable=self.conic_mode, value="Midpoint")
 
         view_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Вид", menu=view_menu)
@@ -274,6 +375,7 @@ class GraphicalEditor:
     def set_tool(self, tool_name):
         self.current_tool = tool_name
         self.clear_temp_feedback()
+        self.clear_preview()
         self.click_points = []
         print(f"Tool selected: {self.current_tool}")
         self.update_status_for_tool()
@@ -300,115 +402,236 @@ class GraphicalEditor:
         self.update_status_for_tool()
 
         draw_final = False
-        if self.current_tool == "Circle" and len(self.click_points) == 2:
-            self.draw_circle()
-            draw_final = True
-        elif self.current_tool == "Ellipse" and len(self.click_points) == 3:
-            self.draw_ellipse()
-            draw_final = True
-        elif self.current_tool == "Parabola" and len(self.click_points) == 2:
-            self.draw_parabola()
-            draw_final = True
-        elif self.current_tool == "Hyperbola" and len(self.click_points) == 3:
-            self.draw_hyperbola()
+        if len(self.click_points) == POINTS_PER_KIND.get(self.current_tool):
+            mode = self.conic_mode.get()
+            if self.draw_primitive(self.current_tool, self.click_points, mode):
+                self.scene.add(self.current_tool, self.click_points, mode)
             draw_final = True
 
         if draw_final:
             self.click_points = []
             self.clear_temp_feedback()
+            self.clear_preview()
             self.update_status_for_tool()
 
 
     def on_canvas_motion(self, event):
-        pass
+        # события мыши приходят чаще кадров: запоминаем курсор, рисуем не чаще PREVIEW_FPS
+        self.preview_cursor = (event.x, event.y)
+        if self.preview_after_id is None and self.click_points:
+            self.preview_after_id = self.canvas.after(1000 // self.PREVIEW_FPS, self.render_preview)
+
+    def clear_preview(self):
+        if self.preview_after_id is not None:
+            self.canvas.after_cancel(self.preview_after_id)
+            self.preview_after_id = None
+        for item_id in self.preview_items:
+            self.canvas.delete(item_id)
+        self.preview_items = []
+
+    def unit_circle(self, r):
+        """Единичная окружность с числом точек - степенью двойки под периметр радиуса r."""
+        steps = 32
+        while steps < 2 * math.pi * r / 4 and steps < 1024:
+            steps *= 2
+        unit = self.preview_unit_circles.get(steps)
+        if unit is None:
+            t = 2 * math.pi * np.arange(steps + 1) / steps
+            unit = np.column_stack((np.cos(t), np.sin(t)))
+            self.preview_unit_circles[steps] = unit
+        return unit
+
+    def preview_branches(self, cursor):
+        """Ветви кривой, если последней точкой текущего инструмента взять cursor.
+
+        Параметры меняются каждый кадр, поэтому ConicCache здесь не используется,
+        чтобы не вытеснять из него шаблоны уже нарисованных фигур. Параболы и
+        гиперболы ограничены тем же conic_extent(), что и при рисовании.
+        """
+        points = self.click_points + [cursor]
+        tool = self.current_tool
+        if tool == "Circle" and len(points) == 2:
+            (cx, cy), (px, py) = points
+            r = math.hypot(px - cx, py - cy)
+            return [self.unit_circle(r) * r + (cx, cy)]
+        if tool == "Ellipse" and len(points) in (2, 3):
+            (cx, cy), (px_x, py_x) = points[:2]
+            rx = abs(px_x - cx)
+            ry = abs(points[2][1] - cy) if len(points) == 3 else abs(py_x - cy)
+            return [self.unit_circle(max(rx, ry)) * (rx, ry) + (cx, cy)]
+        if tool == "Parabola" and len(points) == 2:
+            (vx, vy), (px, py) = points
+            return [calculate_parabola_points(vx, vy, px, py, self.conic_extent())]
+        if tool == "Hyperbola" and len(points) == 3:
+            (cx, cy), (ax, ay), (bx, by) = points
+            return list(calculate_hyperbola_points(cx, cy, ax, ay, bx, by, self.conic_extent()))
+        return []
+
+    def render_preview(self):
+        self.preview_after_id = None
+        if not self.click_points or self.preview_cursor is None:
+            return
+        branches = [b for b in self.preview_branches(self.preview_cursor) if len(b) > 1]
+        # элементы прошлого кадра переиспользуются через coords(), лишние удаляются
+        for i, branch in enumerate(branches):
+            coords = branch.ravel().tolist()
+            if i < len(self.preview_items):
+                self.canvas.coords(self.preview_items[i], coords)
+            else:
+                self.preview_items.append(self.canvas.create_line(coords, fill="gray", dash=(4, 2), tags="preview"))
+        for item_id in self.preview_items[len(branches):]:
+            self.canvas.delete(item_id)
+        del self.preview_items[len(branches):]
 
-    def draw_curve(self, points_list, curve_type, params_desc):
-        if not points_list:
+    def draw_curve(self, points_list, curve_type, params_desc, show_debug=True):
+        """points_list - массив (N, 2) одной кривой или список таких массивов по ветвям."""
+        branches = [points_list] if isinstance(points_list, np.ndarray) else list(points_list)
+        if not any(len(branch) for branch in branches):
             print("Warning: No points generated for the curve.")
             self.update_status(f"Не удалось построить {curve_type}. Проверьте точки.")
-            return
+            return False
 
         color = "blue"
         width = 2
 
-        if points_list and isinstance(points_list[0], tuple):
-            if len(points_list) > 1:
-                canvas_id = self.canvas.create_line(points_list, fill=color, width=width, tags="curve")
-                self.drawn_objects_ids.append(canvas_id)
-                all_points_for_debug = points_list
-            else:
-                all_points_for_debug = []
-
-        elif points_list and isinstance(points_list[0], list):
-            all_points_for_debug = []
-            branch_ids = []
-            for branch_points in points_list:
-                 if len(branch_points) > 1:
-                    canvas_id = self.canvas.create_line(branch_points, fill=color, width=width, tags="curve")
-                    branch_ids.append(canvas_id)
-                    all_points_for_debug.extend(branch_points)
-                 elif len(branch_points) == 1:
-                      all_points_for_debug.extend(branch_points)
-            if branch_ids:
-                 self.drawn_objects_ids.append(branch_ids)
-
-        else:
-             all_points_for_debug = []
+        all_points_for_debug = []
+        branch_ids = []
+        for branch_points in branches:
+            if len(branch_points) > 1:
+                canvas_id = self.canvas.create_line(branch_points.ravel().tolist(), fill=color, width=width, tags="curve")
+                branch_ids.append(canvas_id)
+            all_points_for_debug.extend(map(tuple, branch_points.tolist()))
 
+        if isinstance(points_list, np.ndarray):
+            self.drawn_objects_ids.extend(branch_ids)
+        elif branch_ids:
+            self.drawn_objects_ids.append(branch_ids)
 
         self.update_status(f"{curve_type} нарисован(а).")
 
-        if self.debug_mode.get() and all_points_for_debug:
+        if show_debug and self.debug_mode.get() and all_points_for_debug:
             self.show_debug_steps(all_points_for_debug, curve_type, params_desc)
+        return True
+
 
+    def draw_primitive(self, kind, click_points, mode, show_debug=True):
+        """Строит фигуру по точкам-кликам; возвращает True, если на холсте что-то нарисовано."""
+        draw = {
+            "Circle": self.draw_circle,
+            "Ellipse": self.draw_ellipse,
+            "Parabola": self.draw_parabola,
+            "Hyperbola": self.draw_hyperbola,
+        }[kind]
+        return draw(click_points, mode, show_debug)
 
-    def draw_circle(self):
-        (cx, cy), (px, py) = self.click_points
+    def draw_circle(self, click_points, mode, show_debug=True):
+        (cx, cy), (px, py) = click_points
         r = math.sqrt((px - cx)**2 + (py - cy)**2)
         if r < 1:
              self.update_status("Радиус слишком мал.")
-             return
-        points = calculate_circle_points(cx, cy, r)
-        self.draw_curve(points, "Окружность", f"Центр:({cx},{cy}), R:{r:.1f}")
+             return False
+        calculate, _ = CONIC_MODES[mode]
+        points = self.conic_cache.points(calculate, (cx, cy), r)
+        return self.draw_curve(points, "Окружность", f"Центр:({cx},{cy}), R:{r:.1f}", show_debug)
 
-    def draw_ellipse(self):
-        (cx, cy), (px_x, py_x), (px_y, py_y) = self.click_points
+    def draw_ellipse(self, click_points, mode, show_debug=True):
+        (cx, cy), (px_x, py_x), (px_y, py_y) = click_points
         rx = abs(px_x - cx)
         ry = abs(py_y - cy)
         if rx < 1 or ry < 1:
              self.update_status("Радиусы эллипса слишком малы.")
-             return
-        points = calculate_ellipse_points(cx, cy, rx, ry)
-        self.draw_curve(points, "Эллипс", f"Центр:({cx},{cy}), Rx:{rx:.1f}, Ry:{ry:.1f}")
+             return False
+        _, calculate = CONIC_MODES[mode]
+        points = self.conic_cache.points(calculate, (cx, cy), rx, ry)
+        return self.draw_curve(points, "Эллипс", f"Центр:({cx},{cy}), Rx:{rx:.1f}, Ry:{ry:.1f}", show_debug)
+
+
+    def conic_extent(self):
+        """Докуда строить параболы и гиперболы от вершины (центра): диагональ холста.
 
+        Округляется вверх до CONIC_EXTENT_STEP, чтобы изменение размера окна не
+        сбрасывало ключи ConicCache.
+        """
+        diagonal = math.hypot(self.canvas.winfo_width(), self.canvas.winfo_height())
+        return CONIC_EXTENT_STEP * max(1, math.ceil(diagonal / CONIC_EXTENT_STEP))
 
-    def draw_parabola(self):
-        (vx, vy), (px, py) = self.click_points
+    def draw_parabola(self, click_points, mode, show_debug=True):
+        (vx, vy), (px, py) = click_points
         if abs(vx - px) < 1 and abs(vy - py) < 1:
              self.update_status("Точки параболы слишком близки.")
-             return
-        points = calculate_parabola_points(vx, vy, px, py)
-        self.draw_curve(points, "Парабола", f"Верш:({vx},{vy}), Точка:({px},{py})")
+             return False
+        points = self.conic_cache.points(calculate_parabola_points, (vx, vy), px - vx, py - vy, self.conic_extent())
+        return self.draw_curve(points, "Парабола", f"Верш:({vx},{vy}), Точка:({px},{py})", show_debug)
 
-    def draw_hyperbola(self):
-        (cx, cy), (ax, ay), (bx, by) = self.click_points
+    def draw_hyperbola(self, click_points, mode, show_debug=True):
+        (cx, cy), (ax, ay), (bx, by) = click_points
         if (abs(cx-ax)<1 and abs(cy-ay)<1) or \
            (abs(cx-bx)<1 and abs(cy-by)<1) or \
            (abs(ax-bx)<1 and abs(ay-by)<1):
             self.update_status("Точки гиперболы слишком близки или совпадают.")
+            return False
+
+        points1, points2 = self.conic_cache.points(calculate_hyperbola_points, (cx, cy), ax - cx, ay - cy, bx - cx, by - cy,
+                                                   self.conic_extent())
+        return self.draw_curve([points1, points2], "Гипербола", f"Ц:({cx},{cy}), A:({ax},{ay}), B:({bx},{by})", show_debug)
+
+    def render_scene(self):
+        """Перерисовывает весь холст по self.scene без отладочной пошаговой отрисовки."""
+        self.canvas.delete("curve")
+        self.drawn_objects_ids = []
+        for kind, mode, click_points in self.scene:
+            self.draw_primitive(kind, [(round(x), round(y)) for x, y in click_points], mode, show_debug=False)
+        self.update_status(f"Сцена перестроена: фигур {len(self.scene)}.")
+
+    def open_scene(self):
+        filepath = filedialog.askopenfilename(
+            title="Открыть сцену",
+            filetypes=(("Сцены кривых", "*.conics"), ("Все файлы", "*.*"))
+        )
+        if not filepath:
             return
+        try:
+            scene = ConicScene.load(filepath)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Ошибка загрузки", f"Не удалось прочитать сцену:\n{e}")
+            return
+        self.scene = scene
+        self.render_scene()
+
+    def save_scene(self):
+        filepath = filedialog.asksaveasfilename(
+            title="Сохранить сцену",
+            defaultextension=".conics",
+            filetypes=(("Сцены кривых", "*.conics"), ("Все файлы", "*.*"))
+        )
+        if not filepath:
+            return
+        try:
+            self.scene.save(filepath)
+        except OSError as e:
+            messagebox.showerror("Ошибка сохранения", f"Не удалось записать сцену:\n{e}")
+            return
+        self.update_status(f"Сцена сохранена: фигур {len(self.scene)}.")
 
-        points1, points2 = calculate_hyperbola_points(cx, cy, ax, ay, bx, by)
-        self.draw_curve([points1, points2], "Гипербола", f"Ц:({cx},{cy}), A:({ax},{ay}), B:({bx},{by})")
+    def rescale_scene(self):
+        factor = simpledialog.askfloat("Масштаб сцены", "Во сколько раз увеличить сцену:",
+                                       initialvalue=2.0, minvalue=0.01, maxvalue=100.0)
+        if factor is None:
+            return
+        self.scene = self.scene.scaled(factor)
+        self.render_scene()
 
     def clear_canvas(self):
          self.canvas.delete("curve")
          self.clear_temp_feedback()
+         self.clear_preview()
          self.drawn_objects_ids = []
+         self.scene.clear()
          self.click_points = []
          if self.debug_canvas:
-             self.debug_canvas.delete("pixels")
-             self.debug_canvas.delete("debug_info")
+             self.stop_debug_steps()
+             self.debug_grid.clear_cells()
+             self.draw_debug_grid()
          self.update_status("Холст очищен.")
          if self.current_tool: self.update_status_for_tool()
 
@@ -431,9 +654,17 @@ class GraphicalEditor:
 
              dbg_canvas_size = 450
              self.debug_canvas = tk.Canvas(self.debug_window, bg="#E0E0E0",
-                                           width=dbg_canvas_size, height=dbg_canvas_size,
-                                           scrollregion=(0, 0, dbg_canvas_size, dbg_canvas_size)) # Set scroll region if needed later
+                                           width=dbg_canvas_size, height=dbg_canvas_size, highlightthickness=0)
              self.debug_canvas.pack(pady=10, padx=10)
+             self.debug_grid = PixelGrid(dbg_canvas_size, dbg_canvas_size, cell_size=1)
+             self.debug_photo = tk.PhotoImage(width=dbg_canvas_size, height=dbg_canvas_size)
+             self.debug_canvas.create_image(0, 0, anchor=tk.NW, image=self.debug_photo)
+             self.debug_cursor_id = self.debug_canvas.create_rectangle(0, 0, 0, 0, outline="darkred", width=2, state=tk.HIDDEN)
+             self.debug_canvas.bind("<MouseWheel>", self.on_debug_zoom)
+             self.debug_canvas.bind("<Button-4>", self.on_debug_zoom)
+             self.debug_canvas.bind("<Button-5>", self.on_debug_zoom)
+             self.debug_canvas.bind("<ButtonPress-1>", self.on_debug_pan_start)
+             self.debug_canvas.bind("<B1-Motion>", self.on_debug_pan)
 
              self.debug_info_label = tk.Label(self.debug_window, text="Информация:", justify=tk.LEFT)
              self.debug_info_label.pack(fill=tk.X, padx=10)
@@ -444,74 +675,78 @@ class GraphicalEditor:
                   self.debug_window.withdraw()
 
     def on_debug_close(self):
+         self.stop_debug_steps()
          self.debug_mode.set(False)
          self.debug_window.withdraw()
 
-    def draw_debug_grid(self):
+    def draw_debug_grid(self, current=None):
+        """Переносит кадр сетки в PhotoImage; current - пиксель, который обводится рамкой."""
         if not self.debug_canvas: return
-        self.debug_canvas.delete("grid")
-        w = int(self.debug_canvas.cget("width"))
-        h = int(self.debug_canvas.cget("height"))
-        step = self.debug_grid_step
-
-        grid_color = "#B0B0B0"
-
-        for i in range(0, w + 1, step):
-            self.debug_canvas.create_line(i, 0, i, h, fill=grid_color, tags="grid")
-        for i in range(0, h + 1, step):
-            self.debug_canvas.create_line(0, i, w, i, fill=grid_color, tags="grid")
-
-        axis_color = "#808080"
-        center_x = (w // (2*step)) * step
-        center_y = (h // (2*step)) * step
-        self.debug_canvas.create_line(center_x, 0, center_x, h, fill=axis_color, width=1, tags="grid")
-        self.debug_canvas.create_line(0, center_y, w, center_y, fill=axis_color, width=1, tags="grid")
-
+        self.debug_grid.render().blit(self.debug_photo)
+        if current is None:
+            self.debug_canvas.itemconfig(self.debug_cursor_id, state=tk.HIDDEN)
+            return
+        x0, y0 = self.debug_grid.to_screen(*current)
+        cs = self.debug_grid.cell_size
+        self.debug_canvas.coords(self.debug_cursor_id, x0, y0, x0 + cs, y0 + cs)
+        self.debug_canvas.itemconfig(self.debug_cursor_id, state=tk.NORMAL)
+
+    def on_debug_zoom(self, event):
+        zoom_in = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.debug_grid.zoom_at(2.0 if zoom_in else 0.5, event.x, event.y)
+        self.draw_debug_grid()
+
+    def on_debug_pan_start(self, event):
+        self.debug_pan_anchor = (event.x, event.y)
+
+    def on_debug_pan(self, event):
+        ax, ay = self.debug_pan_anchor
+        self.debug_grid.pan(event.x - ax, event.y - ay)
+        self.debug_pan_anchor = (event.x, event.y)
+        self.draw_debug_grid()
+
+    def stop_debug_steps(self):
+        if self.debug_after_id is not None:
+            self.debug_canvas.after_cancel(self.debug_after_id)
+            self.debug_after_id = None
 
     def show_debug_steps(self, points_list, curve_type, params_desc):
          if not self.debug_mode.get() or not points_list: return
          self.ensure_debug_window()
          if not self.debug_canvas: return
 
-         self.debug_canvas.delete("pixels")
-         self.debug_canvas.delete("debug_info")
+         self.stop_debug_steps()
+         grid = self.debug_grid
+         grid.clear_cells()
+         xs = [p[0] for p in points_list]
+         ys = [p[1] for p in points_list]
+         grid.fit(min(xs), min(ys), max(xs), max(ys))
          self.draw_debug_grid()
 
          self.debug_info_label.config(text=f"Кривая: {curve_type}\nПараметры: {params_desc}\nШаги: ...")
          self.master.update_idletasks()
 
          total_steps = len(points_list)
+         batch = max(1, -(-total_steps // self.debug_max_frames))
 
-         def draw_one_step(step_index):
+         def draw_steps(step_index):
              if step_index >= total_steps:
+                 self.debug_after_id = None
+                 self.draw_debug_grid()
                  self.debug_info_label.config(text=f"Кривая: {curve_type}\nПараметры: {params_desc}\nШаги: Готово ({total_steps})")
                  return
 
-             x, y = points_list[step_index]
-
-             dc_w = int(self.debug_canvas.cget("width"))
-             dc_h = int(self.debug_canvas.cget("height"))
-
-             info_text = f"Шаг {step_index + 1}/{total_steps}: Координаты ({x},{y})"
-
-             if 0 <= x < dc_w and 0 <= y < dc_h:
-                 ps = self.debug_pixel_size
-                 x0 = x - ps // 2
-                 y0 = y - ps // 2
-                 x1 = x0 + ps
-                 y1 = y0 + ps
-                 self.debug_canvas.create_rectangle(x0, y0, x1, y1, fill="red", outline="red", tags=("pixels", "current_pixel"))
-                 info_text += " - Нарисован"
-             else:
-                  info_text += " - Вне границ отладочного холста"
+             end = min(total_steps, step_index + batch)
+             for x, y in points_list[step_index:end]:
+                 grid.set_cell(x, y, (255, 0, 0))
+             x, y = points_list[end - 1]
+             self.draw_debug_grid(current=(x, y))
+             info_text = f"Шаг {end}/{total_steps}: Координаты ({x},{y})"
              self.debug_info_label.config(text=f"Кривая: {curve_type}\nПараметры: {params_desc}\n{info_text}")
 
-             self.debug_canvas.itemconfig("current_pixel", fill="darkred", outline="darkred")
-             self.debug_canvas.dtag("current_pixel", "current_pixel") # Remove tag
-
-             self.debug_canvas.after(self.debug_delay_ms, draw_one_step, step_index + 1)
+             self.debug_after_id = self.debug_canvas.after(self.debug_delay_ms, draw_steps, end)
 
-         draw_one_step(0)
+         draw_steps(0)
 
 
 if __name__ == "__main__":
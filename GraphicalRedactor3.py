@@ -24,6 +24,97 @@ M_BS = (1/6) * np.array([
     [ 1,  4,  1,  0]
 ])
 
+BASIS_MATRICES = {"hermite": M_H, "bezier": M_B, "bspline": M_BS}
+
+# (тип кривой, число шагов) -> матрица T·M
+_segment_basis_cache = {}
+
+def segment_basis(curve_type, num_steps):
+    """Матрица (num_steps+1, 4): строки [t^3, t^2, t, 1] при t = i/num_steps, умноженные на базисную матрицу кривой."""
+    key = (curve_type, num_steps)
+    basis = _segment_basis_cache.get(key)
+    if basis is None:
+        t = np.arange(num_steps + 1) / num_steps
+        T = np.column_stack((t**3, t**2, t, np.ones_like(t)))
+        basis = _segment_basis_cache[key] = T @ BASIS_MATRICES[curve_type]
+    return basis
+
+def geometry_matrix(curve_type, pts):
+    """Геометрическая матрица G сегмента по четырём управляющим точкам."""
+    if curve_type == "hermite":
+        P0 = pts[0]
+        P1 = pts[1]
+        T0 = pts[2] - P0
+        T1 = pts[3] - P1
+        return np.array([P0, P1, T0, T1])
+    return pts
+
+def evaluate_segment(curve_type, points_coords, num_steps):
+    """Точки сегмента (num_steps+1, 2) одним произведением (T·M) @ G."""
+    return segment_basis(curve_type, num_steps) @ geometry_matrix(curve_type, np.array(points_coords))
+
+def evaluate_segment_forward(curve_type, points_coords, num_steps):
+    """Те же точки, что у evaluate_segment, прямыми разностями: три сложения на координату за шаг."""
+    coeffs = BASIS_MATRICES[curve_type] @ geometry_matrix(curve_type, np.array(points_coords))
+    h = 1 / num_steps
+    columns = []
+    for a, b, c, d in coeffs.T.tolist():
+        p = d
+        d1 = a * h**3 + b * h**2 + c * h
+        d2 = 6 * a * h**3 + 2 * b * h**2
+        d3 = 6 * a * h**3
+        values = [p]
+        for _ in range(num_steps):
+            p += d1
+            d1 += d2
+            d2 += d3
+            values.append(p)
+        columns.append(values)
+    return np.column_stack(columns)
+
+# T·M·G = T·M_B·(TO_BEZIER·G): сегмент любого типа переводится в управляющие точки Безье
+TO_BEZIER = {curve_type: np.linalg.inv(M_B) @ M for curve_type, M in BASIS_MATRICES.items()}
+FLATNESS_TOLERANCE = 0.25
+MAX_SUBDIVISION_DEPTH = 16
+
+def _is_flat(p0, p1, p2, p3, tolerance):
+    """Внутренние точки Безье лежат не дальше tolerance пикселей от отрезка p0-p3."""
+    dx, dy = p3[0] - p0[0], p3[1] - p0[1]
+    length_sq = dx * dx + dy * dy
+    for x, y in (p1, p2):
+        # расстояние до отрезка, а не до прямой: иначе кривая может выйти за концы хорды
+        t = 0.0 if length_sq < 1e-12 else max(0.0, min(1.0, ((x - p0[0]) * dx + (y - p0[1]) * dy) / length_sq))
+        if (x - p0[0] - t * dx)**2 + (y - p0[1] - t * dy)**2 > tolerance * tolerance:
+            return False
+    return True
+
+def evaluate_segment_adaptive(curve_type, points_coords, num_steps=None, tolerance=FLATNESS_TOLERANCE):
+    """Точки сегмента делением де Кастельжо до плоскостности tolerance пикселей; num_steps не используется."""
+    control = (TO_BEZIER[curve_type] @ geometry_matrix(curve_type, np.array(points_coords, dtype=float))).tolist()
+    result = [control[0]]
+    stack = [(control, 0)]
+    while stack:
+        (p0, p1, p2, p3), depth = stack.pop()
+        if depth >= MAX_SUBDIVISION_DEPTH or _is_flat(p0, p1, p2, p3, tolerance):
+            result.append(p3)
+            continue
+        p01 = [(p0[0] + p1[0]) / 2, (p0[1] + p1[1]) / 2]
+        p12 = [(p1[0] + p2[0]) / 2, (p1[1] + p2[1]) / 2]
+        p23 = [(p2[0] + p3[0]) / 2, (p2[1] + p3[1]) / 2]
+        p012 = [(p01[0] + p12[0]) / 2, (p01[1] + p12[1]) / 2]
+        p123 = [(p12[0] + p23[0]) / 2, (p12[1] + p23[1]) / 2]
+        mid = [(p012[0] + p123[0]) / 2, (p012[1] + p123[1]) / 2]
+        # правая половина кладётся первой, чтобы левая обрабатывалась раньше
+        stack.append(([mid, p123, p23, p3], depth + 1))
+        stack.append(([p0, p01, p012, mid], depth + 1))
+    return np.array(result)
+
+EVALUATORS = {
+    "matrix": evaluate_segment,
+    "forward": evaluate_segment_forward,
+    "adaptive": evaluate_segment_adaptive,
+}
+
 class CurveEditor(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -35,9 +126,13 @@ class CurveEditor(tk.Tk):
         self.active_point_indices = []
 
         self.curve_segments = []
+        # индекс точки -> индексы сегментов, в которые она входит
+        self.point_segments = {}
+        self.live_point_items = set()
         self.curve_type = tk.StringVar(value="bezier")
         self.stitching_mode = tk.BooleanVar(value=False)
         self.num_steps = 50
+        self.evaluation_mode = tk.StringVar(value="matrix")
         self.point_radius = 4
         self.selected_point_index = None
         self.drag_offset = (0, 0)
@@ -64,6 +159,10 @@ class CurveEditor(tk.Tk):
         curve_menu.add_separator()
         curve_menu.add_checkbutton(label="Состыковка сегментов", variable=self.stitching_mode,
                                    onvalue=True, offvalue=False, command=self._on_stitching_mode_change)
+        curve_menu.add_separator()
+        curve_menu.add_radiobutton(label="Вычисление: матрица T·M", variable=self.evaluation_mode, value="matrix")
+        curve_menu.add_radiobutton(label="Вычисление: прямые разности", variable=self.evaluation_mode, value="forward")
+        curve_menu.add_radiobutton(label="Вычисление: адаптивное деление", variable=self.evaluation_mode, value="adaptive")
 
         toolbar = ttk.Frame(self, padding="5")
         toolbar.pack(side=tk.TOP, fill=tk.X)
@@ -145,6 +244,8 @@ class CurveEditor(tk.Tk):
         self.all_control_point_items = []
         self.active_point_indices = []
         self.curve_segments = []
+        self.point_segments = {}
+        self.live_point_items = set()
         self.selected_point_index = None
         print("Холст очищен.")
         self._update_status()
@@ -164,6 +265,7 @@ class CurveEditor(tk.Tk):
         self.all_control_points.append((x, y))
         item_id = self._draw_point(x, y)
         self.all_control_point_items.append(item_id)
+        self.live_point_items.add(item_id)
         new_point_index = len(self.all_control_points) - 1
 
         self.active_point_indices.append(new_point_index)
@@ -222,7 +324,7 @@ class CurveEditor(tk.Tk):
              dist_sq = (x - px)**2 + (y - py)**2
              if dist_sq < min_dist_sq:
                  item_id = self.all_control_point_items[idx]
-                 if self.canvas.winfo_exists() and item_id in self.canvas.find_all():
+                 if self.canvas.winfo_exists() and item_id in self.live_point_items:
                      min_dist_sq = dist_sq
                      found_idx = idx
 
@@ -247,7 +349,7 @@ class CurveEditor(tk.Tk):
             self.all_control_points[self.selected_point_index] = (x, y)
 
             item_id = self.all_control_point_items[self.selected_point_index]
-            if self.canvas.winfo_exists() and item_id in self.canvas.find_all():
+            if self.canvas.winfo_exists() and item_id in self.live_point_items:
                  self.canvas.coords(item_id,
                                    x - self.point_radius, y - self.point_radius,
                                    x + self.point_radius, y + self.point_radius)
@@ -263,7 +365,7 @@ class CurveEditor(tk.Tk):
         if self.selected_point_index is not None:
             idx = self.selected_point_index
             item_id = self.all_control_point_items[idx]
-            if self.canvas.winfo_exists() and item_id in self.canvas.find_all():
+            if self.canvas.winfo_exists() and item_id in self.live_point_items:
                  try:
                      self.canvas.itemconfig(item_id, fill="blue")
                  except tk.TclError:
@@ -281,21 +383,18 @@ class CurveEditor(tk.Tk):
 
     def _redraw_affected_curves(self, changed_point_index):
         print(f"Перерисовка кривых, затронутых точкой {changed_point_index}")
-        for i, segment in enumerate(self.curve_segments):
-            if changed_point_index in segment['points_indices']:
-                print(f"  - Сегмент {i} (тип {segment['type']}, точки {segment['points_indices']}) затронут.")
-                for line_id in segment['line_ids']:
-                     if self.canvas.winfo_exists() and line_id in self.canvas.find_all():
-                         self.canvas.delete(line_id)
-
-                try:
-                    segment_points_coords = [self.all_control_points[idx] for idx in segment['points_indices']]
-                except IndexError:
-                     print(f"Ошибка: Индекс точки вне диапазона при перерисовке сегмента {i}.")
-                     continue
-
-                new_line_ids = self._draw_curve_segment(segment['type'], segment_points_coords)
-                self.curve_segments[i]['line_ids'] = new_line_ids
+        for i in self.point_segments.get(changed_point_index, ()):
+            segment = self.curve_segments[i]
+            print(f"  - Сегмент {i} (тип {segment['type']}, точки {segment['points_indices']}) затронут.")
+            try:
+                segment_points_coords = [self.all_control_points[idx] for idx in segment['points_indices']]
+            except IndexError:
+                 print(f"Ошибка: Индекс точки вне диапазона при перерисовке сегмента {i}.")
+                 continue
+
+            calculated_points = self._calculate_segment_points(segment['type'], segment_points_coords)
+            if len(calculated_points) > 1:
+                self.canvas.coords(segment['line_id'], calculated_points.ravel().tolist())
                 print(f"  - Сегмент {i} перерисован.")
 
     def draw_curve(self):
@@ -319,68 +418,44 @@ class CurveEditor(tk.Tk):
         print(f"Рисуем {curve} с точками (индексы): {current_segment_indices}")
         print(f"Координаты: {segment_points_coords}")
 
-        line_ids = self._draw_curve_segment(curve, segment_points_coords)
+        line_id = self._draw_curve_segment(curve, segment_points_coords)
 
-        if line_ids:
+        if line_id is not None:
             self.curve_segments.append({
                 'type': curve,
                 'points_indices': current_segment_indices,
-                'line_ids': line_ids
+                'line_id': line_id
             })
+            segment_index = len(self.curve_segments) - 1
+            for idx in set(current_segment_indices):
+                self.point_segments.setdefault(idx, []).append(segment_index)
             print(f"Сегмент сохранен. Всего сегментов: {len(self.curve_segments)}")
         else:
              print("Не удалось нарисовать сегмент.")
 
-    def _draw_curve_segment(self, curve_type, points_coords):
-        line_ids = []
-        calculated_points = []
+    def _calculate_segment_points(self, curve_type, points_coords):
         pts = np.array(points_coords)
 
         if len(pts) != 4:
-             print(f"Ошибка (_draw_curve_segment): Ожидалось 4 точки, получено {len(pts)}")
-             return []
-
-        if curve_type == "hermite":
-            P0 = pts[0]
-            P1 = pts[1]
-            T0 = pts[2] - P0
-            T1 = pts[3] - P1
-            G_H = np.array([P0, P1, T0, T1])
-
-            for i in range(self.num_steps + 1):
-                t = i / self.num_steps
-                T_vec = np.array([t**3, t**2, t, 1])
-                point = T_vec @ M_H @ G_H
-                calculated_points.append(point)
-
-        elif curve_type == "bezier":
-            G_B = pts
-            for i in range(self.num_steps + 1):
-                t = i / self.num_steps
-                T_vec = np.array([t**3, t**2, t, 1])
-                point = T_vec @ M_B @ G_B
-                calculated_points.append(point)
-
-        elif curve_type == "bspline":
-            G_BS = pts
-            for i in range(self.num_steps + 1):
-                t = i / self.num_steps
-                T_vec = np.array([t**3, t**2, t, 1])
-                point = T_vec @ M_BS @ G_BS
-                calculated_points.append(point)
-
-        if len(calculated_points) > 1:
-            color = "red" if curve_type=="hermite" else "green" if curve_type=="bezier" else "purple"
-            width = 2
-            tag = f"curve_segment_{len(self.curve_segments)}"
-            for i in range(len(calculated_points) - 1):
-                p1 = calculated_points[i]
-                p2 = calculated_points[i+1]
-                line_id = self.canvas.create_line(p1[0], p1[1], p2[0], p2[1],
-                                                   fill=color, width=width, tags=("curve", tag))
-                line_ids.append(line_id)
-
-        return line_ids
+             print(f"Ошибка (_calculate_segment_points): Ожидалось 4 точки, получено {len(pts)}")
+             return np.empty((0, 2))
+
+        if curve_type not in BASIS_MATRICES:
+            return np.empty((0, 2))
+        evaluate = EVALUATORS[self.evaluation_mode.get()]
+        return evaluate(curve_type, pts, self.num_steps)
+
+    def _draw_curve_segment(self, curve_type, points_coords):
+        """Рисует сегмент одной ломаной; возвращает id элемента холста или None."""
+        calculated_points = self._calculate_segment_points(curve_type, points_coords)
+        if len(calculated_points) < 2:
+            return None
+
+        color = "red" if curve_type=="hermite" else "green" if curve_type=="bezier" else "purple"
+        width = 2
+        tag = f"curve_segment_{len(self.curve_segments)}"
+        return self.canvas.create_line(calculated_points.ravel().tolist(),
+                                       fill=color, width=width, tags=("curve", tag))
 
 if __name__ == "__main__":
     app = CurveEditor()
@@ -0,0 +1,193 @@
+import argparse
+import cProfile
+import functools
+import pstats
+import random
+import sys
+import time
+
+import numpy as np
+
+import GraphicalRedactor2 as editor
+
+SIZES = (5, 20, 80, 300, 1000)
+SHAPES_PER_SIZE = 50
+
+
+def _circle_params(rng, size):
+    return (rng.randint(0, 1000), rng.randint(0, 1000), rng.uniform(0.5, 1.0) * size)
+
+
+def _ellipse_params(rng, size):
+    return (rng.randint(0, 1000), rng.randint(0, 1000),
+            rng.randint(max(1, size // 2), size), rng.randint(max(1, size // 2), size))
+
+
+def _parabola_params(rng, size):
+    vx, vy = rng.randint(0, 1000), rng.randint(0, 1000)
+    return (vx, vy, vx + rng.choice((-1, 1)) * rng.randint(1, size), vy + rng.randint(-size, size))
+
+
+def _hyperbola_params(rng, size):
+    cx, cy = rng.randint(0, 1000), rng.randint(0, 1000)
+    return (cx, cy, cx + rng.choice((-1, 1)) * rng.randint(1, size), cy + rng.randint(-size // 4, size // 4),
+            cx + rng.randint(-size, size), cy + rng.randint(-size, size))
+
+
+def _steep_hyperbola_params(rng, size):
+    """Точка B почти на оси через центр: b = a*across/along огромно, асимптоты почти отвесные.
+
+    При size = 300 среди них есть и случай центр (400, 300), A (790, 300), B (401, 599).
+    """
+    cx, cy = rng.randint(0, 1000), rng.randint(0, 1000)
+    sign = rng.choice((-1, 1))
+    return (cx, cy, cx + sign * rng.randint(max(1, size // 2), size), cy,
+            cx + sign * rng.randint(1, 2), cy + rng.choice((-1, 1)) * rng.randint(max(1, size // 2), size))
+
+
+# набор -> (имя функции, генератор параметров (rng, size) -> аргументы)
+FUNCTIONS = {
+    "calculate_circle_points": ("calculate_circle_points", _circle_params),
+    "calculate_circle_points_midpoint": ("calculate_circle_points_midpoint", _circle_params),
+    "calculate_ellipse_points": ("calculate_ellipse_points", _ellipse_params),
+    "calculate_ellipse_points_midpoint": ("calculate_ellipse_points_midpoint", _ellipse_params),
+    "calculate_parabola_points": ("calculate_parabola_points", _parabola_params),
+    "calculate_hyperbola_points": ("calculate_hyperbola_points", _hyperbola_params),
+    "calculate_hyperbola_points:steep": ("calculate_hyperbola_points", _steep_hyperbola_params),
+}
+
+
+def make_cases(name, size, count=SHAPES_PER_SIZE):
+    rng = random.Random(f"{name}:{size}")
+    cases = [FUNCTIONS[name][1](rng, size) for _ in range(count)]
+    if name == "calculate_hyperbola_points:steep" and size == 300:
+        cases[0] = (400, 300, 790, 300, 401, 599)
+    return cases
+
+
+def _branches(result):
+    """Результат calculate_* в виде списка ветвей (у гиперболы их две)."""
+    if isinstance(result, tuple):
+        return [np.asarray(branch) for branch in result]
+    return [np.asarray(result)]
+
+
+def contour_stats(branches):
+    """(точек, повторов подряд, разрывов): разрыв - соседние точки дальше одного пикселя по Чебышёву."""
+    points = duplicates = gaps = 0
+    for branch in branches:
+        points += len(branch)
+        if len(branch) < 2:
+            continue
+        step = np.abs(np.diff(branch.reshape(-1, 2), axis=0)).max(axis=1)
+        duplicates += int(np.count_nonzero(step == 0))
+        gaps += int(np.count_nonzero(step > 1))
+    return points, duplicates, gaps
+
+
+def run_case(name, cases, repeat):
+    """Возвращает (лучшее время, точек, повторов, разрывов) по всем фигурам набора name."""
+    calculate = getattr(editor, FUNCTIONS[name][0])
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for args in cases:
+            calculate(*args)
+        best = min(best, time.perf_counter() - start)
+
+    points = duplicates = gaps = 0
+    for args in cases:
+        p, d, g = contour_stats(_branches(calculate(*args)))
+        points += p
+        duplicates += d
+        gaps += g
+    return best, points, duplicates, gaps
+
+
+class DrawCurveTimer:
+    """Обёртка над GraphicalEditor.draw_curve: считает вызовы, время и точки, по желанию - под cProfile."""
+
+    def __init__(self, profile=False):
+        self.calls = 0
+        self.points = 0
+        self.elapsed = 0.0
+        self.profiler = cProfile.Profile() if profile else None
+        self.original = None
+
+    def install(self, editor_cls=editor.GraphicalEditor):
+        self.original = original = editor_cls.draw_curve
+
+        @functools.wraps(original)
+        def draw_curve(app, points_list, *args, **kwargs):
+            self.calls += 1
+            branches = [points_list] if isinstance(points_list, np.ndarray) else points_list
+            self.points += sum(len(b) for b in branches)
+            start = time.perf_counter()
+            if self.profiler is not None:
+                self.profiler.enable()
+            try:
+                return original(app, points_list, *args, **kwargs)
+            finally:
+                if self.profiler is not None:
+                    self.profiler.disable()
+                self.elapsed += time.perf_counter() - start
+
+        editor_cls.draw_curve = draw_curve
+        return self
+
+    def uninstall(self, editor_cls=editor.GraphicalEditor):
+        if self.original is not None:
+            editor_cls.draw_curve = self.original
+            self.original = None
+
+    def report(self, file=sys.stdout, limit=20):
+        per_call = self.elapsed / self.calls * 1e3 if self.calls else 0.0
+        print(f"draw_curve: вызовов {self.calls}, точек {self.points}, всего {self.elapsed:.4f} с, "
+              f"{per_call:.3f} мс на вызов", file=file)
+        if self.profiler is not None and self.calls:
+            pstats.Stats(self.profiler, stream=file).sort_stats("cumulative").print_stats(limit)
+
+
+def run_editor(profile=False):
+    """Запускает редактор с замером draw_curve; отчёт печатается после закрытия окна."""
+    timer = DrawCurveTimer(profile).install()
+    try:
+        root = editor.tk.Tk()
+        editor.GraphicalEditor(root)
+        root.mainloop()
+    finally:
+        timer.uninstall()
+        timer.report()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер скорости и качества построения кривых второго порядка")
+    parser.add_argument("--function", action="append", choices=sorted(FUNCTIONS), help="по умолчанию все")
+    parser.add_argument("--size", action="append", type=int, help=f"размер фигуры в пикселях, по умолчанию {SIZES}")
+    parser.add_argument("--count", type=int, default=SHAPES_PER_SIZE, help="фигур на каждый размер")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--gui", action="store_true", help="запустить редактор с замером draw_curve")
+    parser.add_argument("--cprofile", action="store_true", help="вместе с --gui: профиль cProfile для draw_curve")
+    args = parser.parse_args(argv)
+
+    if args.gui:
+        run_editor(args.cprofile)
+        return 0
+
+    functions = args.function or list(FUNCTIONS)
+    sizes = args.size or list(SIZES)
+
+    print(f"{'function':<34} {'size':>5} {'points':>9} {'time, s':>9} {'Mpts/s':>8} {'dup, %':>7} {'gaps':>6}")
+    for name in functions:
+        for size in sizes:
+            cases = make_cases(name, size, args.count)
+            elapsed, points, duplicates, gaps = run_case(name, cases, args.repeat)
+            elapsed = max(elapsed, 1e-9)
+            dup_ratio = 100.0 * duplicates / points if points else 0.0
+            print(f"{name:<34} {size:>5} {points:>9} {elapsed:>9.4f} {points / elapsed / 1e6:>8.2f} "
+                  f"{dup_ratio:>7.2f} {gaps:>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
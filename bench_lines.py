@@ -0,0 +1,334 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+import raster_core
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_lines_golden.json")
+ALGORITHMS = ("DDA", "Bresenham", "Wu")
+
+
+def _workload_short(rng, n):
+    segs = []
+    for _ in range(n):
+        x, y = rng.randint(0, 1000), rng.randint(0, 1000)
+        segs.append((x, y, x + rng.randint(-4, 4), y + rng.randint(-4, 4)))
+    return segs
+
+
+def _workload_long(rng, n):
+    return [(rng.randint(0, 50), rng.randint(0, 2000), rng.randint(1950, 2000), rng.randint(0, 2000))
+            for _ in range(n)]
+
+
+def _workload_steep(rng, n):
+    segs = []
+    for _ in range(n):
+        x, y = rng.randint(0, 1000), rng.randint(0, 100)
+        segs.append((x, y, x + rng.randint(-20, 20), y + rng.randint(200, 900)))
+    return segs
+
+
+def _workload_shallow(rng, n):
+    segs = []
+    for _ in range(n):
+        x, y = rng.randint(0, 100), rng.randint(0, 1000)
+        segs.append((x, y, x + rng.randint(200, 900), y + rng.randint(-20, 20)))
+    return segs
+
+
+def _workload_degenerate(rng, n):
+    segs = []
+    for i in range(n):
+        x, y = rng.randint(0, 1000), rng.randint(0, 1000)
+        if i % 4 == 0:
+            segs.append((x, y, x, y))
+        elif i % 4 == 1:
+            segs.append((x, y, x + rng.randint(-300, 300), y))
+        elif i % 4 == 2:
+            segs.append((x, y, x, y + rng.randint(-300, 300)))
+        else:
+            d = rng.randint(-300, 300)
+            segs.append((x, y, x + d, y + d))
+    return segs
+
+
+def _workload_random(rng, n):
+    return [(rng.uniform(0, 1000), rng.uniform(0, 1000), rng.uniform(0, 1000), rng.uniform(0, 1000))
+            for _ in range(n)]
+
+
+WORKLOADS = {
+    "short": (_workload_short, 20000),
+    "long": (_workload_long, 200),
+    "steep": (_workload_steep, 1000),
+    "shallow": (_workload_shallow, 1000),
+    "degenerate": (_workload_degenerate, 2000),
+    "random": (_workload_random, 1000),
+}
+
+
+def make_workload(name, scale=1.0):
+    factory, n = WORKLOADS[name]
+    return factory(random.Random(name), max(1, int(n * scale)))
+
+
+def _scalar_backend(algorithm):
+    rasterizer = raster_core.RASTERIZERS[algorithm]
+
+    def run(segments):
+        return [rasterizer(x1, y1, x2, y2, None, None, True) for x1, y1, x2, y2 in segments]
+    return run, run
+
+
+def _batch_backend(algorithm):
+    """Время меряется по самому пакетному вызову, без перевода массивов в списки."""
+    import line_batch
+    rasterizer = line_batch.BATCH_RASTERIZERS[algorithm]
+
+    def run(segments):
+        *arrays, offsets = rasterizer(segments)
+        columns = [a.tolist() for a in arrays]
+        offsets = offsets.tolist()
+        return [list(zip(*(c[offsets[k]:offsets[k + 1]] for c in columns))) for k in range(len(segments))]
+    return run, rasterizer
+
+
+def _two_ended_backend(algorithm):
+    if algorithm != "Bresenham":
+        return None
+
+    def run(segments):
+        return [raster_core.bresenham_two_ended(*s) for s in segments]
+    return run, run
+
+
+def _expand_runs(runs):
+    """Серии Брезенхема (xa, ya, xb, yb) обратно в пиксели."""
+    pixels = []
+    for xa, ya, xb, yb in runs:
+        if ya == yb:
+            step = 1 if xb >= xa else -1
+            pixels.extend((x, ya) for x in range(xa, xb + step, step))
+        else:
+            step = 1 if yb >= ya else -1
+            pixels.extend((xa, y) for y in range(ya, yb + step, step))
+    return pixels
+
+
+def _runs_backend(algorithm):
+    """Серии Брезенхема; для сверки с эталоном разворачиваются обратно в пиксели."""
+    if algorithm != "Bresenham":
+        return None
+
+    def timed(segments):
+        return [list(raster_core.iter_bresenham_runs(*s)) for s in segments]
+
+    def run(segments):
+        return [_expand_runs(runs) for runs in timed(segments)]
+    return run, timed
+
+
+def _fixed_backend(algorithm):
+    if algorithm != "DDA":
+        return None
+
+    def run(segments):
+        return [list(raster_core.iter_dda_fixed(*s)) for s in segments]
+    return run, run
+
+
+def _fixed_batch_backend(algorithm):
+    if algorithm != "DDA":
+        return None
+    return _batch_backend("DDA-fixed")
+
+
+# имя -> фабрика(algorithm) -> (run, timed) или None, если алгоритм не поддерживается:
+# run возвращает пиксели по отрезкам, timed - замеряемый вызов
+BACKENDS = {
+    "scalar": _scalar_backend,
+    "batch": _batch_backend,
+    "two_ended": _two_ended_backend,
+    "runs": _runs_backend,
+    "fixed": _fixed_backend,
+    "fixed_batch": _fixed_batch_backend,
+}
+
+# эти варианты не обязаны совпадать с эталоном бит в бит, только с точностью до пикселя
+APPROXIMATE_BACKENDS = {"fixed", "fixed_batch"}
+
+
+CLIP_VIEWPORT = (200, 150)
+CLIP_SEGMENTS = 3000
+
+
+def make_clip_workload(n=CLIP_SEGMENTS, viewport=CLIP_VIEWPORT):
+    """Отрезки вокруг окна: концы до 1.5 размера окна за его краями, половина - в целых координатах."""
+    rng = random.Random("clip")
+    width, height = viewport
+    segs = []
+    for i in range(n):
+        coord = rng.randint if i % 2 else rng.uniform
+        segs.append(tuple(coord(-3 * size // 2, 5 * size // 2) for size in (width, height, width, height)))
+    return segs
+
+
+# алгоритм -> вариант -> (x1, y1, x2, y2, clip_rect) -> пиксели
+CLIP_VARIANTS = {
+    "DDA": {
+        "scalar": lambda *a: list(raster_core.iter_dda(*a)),
+        "fixed": lambda *a: list(raster_core.iter_dda_fixed(*a)),
+    },
+    "Bresenham": {
+        "scalar": lambda *a: list(raster_core.iter_bresenham(*a)),
+        "two_ended": raster_core.bresenham_two_ended,
+        "runs": lambda *a: _expand_runs(raster_core.iter_bresenham_runs(*a)),
+    },
+    "Wu": {
+        "scalar": lambda *a: list(raster_core.iter_wu(*a)),
+    },
+}
+
+
+def clip_mismatches(pixels_of, algorithm, segments, viewport=CLIP_VIEWPORT):
+    """Сколько отрезков с окном pixel_clip_rect дают внутри растра не те пиксели, что без отсечения."""
+    width, height = viewport
+    clip_rect = raster_core.pixel_clip_rect(width, height, algorithm)
+
+    def visible(pixels):
+        return {p for p in pixels if 0 <= p[0] < width and 0 <= p[1] < height}
+
+    return sum(visible(pixels_of(*s, None)) != visible(pixels_of(*s, clip_rect)) for s in segments)
+
+
+def pixel_digest(per_segment_pixels):
+    """SHA-256 от пикселей всех отрезков; интенсивности Ву округляются до 12 знаков."""
+    h = hashlib.sha256()
+    for pixels in per_segment_pixels:
+        for pixel in pixels:
+            if len(pixel) == 3:
+                h.update(f"{pixel[0]},{pixel[1]},{round(pixel[2], 12)!r};".encode())
+            else:
+                h.update(f"{pixel[0]},{pixel[1]};".encode())
+        h.update(b"|")
+    return h.hexdigest()
+
+
+def load_golden(path=GOLDEN_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def max_deviation(pixels, reference):
+    """Наибольшее по всем пикселям расстояние (по Чебышёву) до ближайшего пикселя эталона того же отрезка."""
+    worst = 0
+    for got, ref in zip(pixels, reference):
+        ref_set = {p[:2] for p in ref}
+        for pixel in got:
+            x, y = pixel[0], pixel[1]
+            if (x, y) in ref_set:
+                continue
+            if any((x + ox, y + oy) in ref_set for ox in (-1, 0, 1) for oy in (-1, 0, 1)):
+                worst = max(worst, 1)
+            else:
+                worst = max(worst, min(max(abs(x - p[0]), abs(y - p[1])) for p in ref_set))
+    return worst
+
+
+def run_case(backend_name, algorithm, segments, repeat):
+    """Возвращает (лучшее время, пиксели по отрезкам). Время меряется без перевода результата в списки."""
+    run, timed = BACKENDS[backend_name](algorithm)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        timed(segments)
+        best = min(best, time.perf_counter() - start)
+
+    return best, run(segments)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер скорости и проверка эталонов для алгоритмов отрезков")
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS), help="по умолчанию все")
+    parser.add_argument("--algorithm", action="append", choices=ALGORITHMS, help="по умолчанию все")
+    parser.add_argument("--workload", action="append", choices=sorted(WORKLOADS), help="по умолчанию все")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--update-golden", action="store_true", help="перезаписать эталоны по скалярной реализации")
+    args = parser.parse_args(argv)
+
+    backends = args.backend or list(BACKENDS)
+    algorithms = args.algorithm or list(ALGORITHMS)
+    workloads = args.workload or list(WORKLOADS)
+
+    if args.update_golden:
+        golden = load_golden()
+        for workload in WORKLOADS:
+            segments = make_workload(workload)
+            for algorithm in ALGORITHMS:
+                run, _ = _scalar_backend(algorithm)
+                pixels = run(segments)
+                golden.setdefault(workload, {})[algorithm] = {
+                    "pixels": sum(len(p) for p in pixels),
+                    "sha256": pixel_digest(pixels),
+                }
+        with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+            json.dump(golden, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Эталоны записаны в {GOLDEN_PATH}")
+        return 0
+
+    golden = load_golden()
+    failures = 0
+    print(f"{'workload':<11} {'algorithm':<10} {'backend':<11} {'segments':>8} {'pixels':>9} "
+          f"{'time, s':>9} {'Mpix/s':>8} {'kseg/s':>8}  golden")
+    for workload in workloads:
+        segments = make_workload(workload)
+        for algorithm in algorithms:
+            expected = golden.get(workload, {}).get(algorithm)
+            for backend_name in backends:
+                if BACKENDS[backend_name](algorithm) is None:
+                    continue
+                elapsed, pixels = run_case(backend_name, algorithm, segments, args.repeat)
+                n_pixels = sum(len(p) for p in pixels)
+                if backend_name in APPROXIMATE_BACKENDS:
+                    reference, _ = _scalar_backend(algorithm)
+                    deviation = max_deviation(pixels, reference(segments))
+                    status = f"<= {deviation} px" if deviation <= 1 else f"РАСХОЖДЕНИЕ ({deviation} px)"
+                    if deviation > 1:
+                        failures += 1
+                elif expected is None:
+                    status = "нет эталона"
+                elif expected["sha256"] == pixel_digest(pixels) and expected["pixels"] == n_pixels:
+                    status = "OK"
+                else:
+                    status = "РАСХОЖДЕНИЕ"
+                    failures += 1
+                elapsed = max(elapsed, 1e-9)
+                print(f"{workload:<11} {algorithm:<10} {backend_name:<11} {len(segments):>8} {n_pixels:>9} "
+                      f"{elapsed:>9.4f} {n_pixels / elapsed / 1e6:>8.2f} {len(segments) / elapsed / 1e3:>8.2f}  {status}")
+
+    segments = make_clip_workload()
+    print(f"\nотсечение окном {CLIP_VIEWPORT[0]}x{CLIP_VIEWPORT[1]}: пиксели в растре должны совпасть с неотсеченными")
+    for algorithm in algorithms:
+        for variant, pixels_of in CLIP_VARIANTS[algorithm].items():
+            mismatches = clip_mismatches(pixels_of, algorithm, segments)
+            status = "OK" if not mismatches else f"РАСХОЖДЕНИЕ ({mismatches} отрезков)"
+            if mismatches:
+                failures += 1
+            print(f"{'clip':<11} {algorithm:<10} {variant:<11} {len(segments):>8}  {status}")
+
+    if failures:
+        print(f"Расхождений с эталоном: {failures}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
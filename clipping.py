@@ -0,0 +1,109 @@
+INSIDE = 0
+LEFT = 1
+RIGHT = 2
+BOTTOM = 4
+TOP = 8
+
+
+def _outcode(x, y, xmin, ymin, xmax, ymax):
+    code = INSIDE
+    if x < xmin:
+        code |= LEFT
+    elif x > xmax:
+        code |= RIGHT
+    if y < ymin:
+        code |= TOP
+    elif y > ymax:
+        code |= BOTTOM
+    return code
+
+
+def clip_line_cohen_sutherland(x1, y1, x2, y2, clip_rect):
+    """Отсечение отрезка окном clip_rect = (xmin, ymin, xmax, ymax) по Коэну-Сазерленду.
+
+    Возвращает (x1, y1, x2, y2) видимой части или None, если отрезок целиком вне окна.
+    """
+    xmin, ymin, xmax, ymax = clip_rect
+    code1 = _outcode(x1, y1, xmin, ymin, xmax, ymax)
+    code2 = _outcode(x2, y2, xmin, ymin, xmax, ymax)
+
+    while True:
+        if not (code1 | code2):
+            return x1, y1, x2, y2
+        if code1 & code2:
+            return None
+
+        code_out = code1 if code1 else code2
+        if code_out & BOTTOM:
+            x = x1 + (x2 - x1) * (ymax - y1) / (y2 - y1)
+            y = ymax
+        elif code_out & TOP:
+            x = x1 + (x2 - x1) * (ymin - y1) / (y2 - y1)
+            y = ymin
+        elif code_out & RIGHT:
+            y = y1 + (y2 - y1) * (xmax - x1) / (x2 - x1)
+            x = xmax
+        else:
+            y = y1 + (y2 - y1) * (xmin - x1) / (x2 - x1)
+            x = xmin
+
+        if code_out == code1:
+            x1, y1 = x, y
+            code1 = _outcode(x1, y1, xmin, ymin, xmax, ymax)
+        else:
+            x2, y2 = x, y
+            code2 = _outcode(x2, y2, xmin, ymin, xmax, ymax)
+
+
+def clip_line_params(x1, y1, x2, y2, clip_rect):
+    """Параметры (t0, t1) видимой в окне clip_rect части отрезка P1 + t*(P2 - P1) по Лиангу-Барски.
+
+    Возвращает None, если отрезок целиком вне окна. Концы, лежащие в окне,
+    дают ровно t0 = 0.0 и t1 = 1.0.
+    """
+    xmin, ymin, xmax, ymax = clip_rect
+    dx = x2 - x1
+    dy = y2 - y1
+    t0, t1 = 0.0, 1.0
+
+    for p, q in ((-dx, x1 - xmin), (dx, xmax - x1), (-dy, y1 - ymin), (dy, ymax - y1)):
+        if p == 0:
+            if q < 0:
+                return None
+            continue
+        t = q / p
+        if p < 0:
+            if t > t1:
+                return None
+            if t > t0:
+                t0 = t
+        else:
+            if t < t0:
+                return None
+            if t < t1:
+                t1 = t
+    return t0, t1
+
+
+def clip_line_liang_barsky(x1, y1, x2, y2, clip_rect):
+    """Отсечение отрезка окном clip_rect = (xmin, ymin, xmax, ymax) по Лиангу-Барски.
+
+    Возвращает (x1, y1, x2, y2) видимой части или None, если отрезок целиком вне окна.
+    """
+    span = clip_line_params(x1, y1, x2, y2, clip_rect)
+    if span is None:
+        return None
+    t0, t1 = span
+    if t0 == 0.0 and t1 == 1.0:
+        return x1, y1, x2, y2
+    dx = x2 - x1
+    dy = y2 - y1
+    return x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy
+
+
+CLIPPERS = {
+    "Cohen-Sutherland": clip_line_cohen_sutherland,
+    "Liang-Barsky": clip_line_liang_barsky,
+}
+
+clip_line = clip_line_liang_barsky
@@ -0,0 +1,83 @@
+import numpy as np
+
+KINDS = ("Circle", "Ellipse", "Parabola", "Hyperbola")
+MODES = ("Parametric", "Midpoint")
+# сколько точек-кликов задают фигуру каждого типа
+POINTS_PER_KIND = {"Circle": 2, "Ellipse": 3, "Parabola": 2, "Hyperbola": 3}
+
+SCENE_MAGIC = b"CONS"
+SCENE_VERSION = 1
+HEADER_DTYPE = np.dtype([("magic", "S4"), ("version", "<u2"), ("count", "<u4")])
+RECORD_DTYPE = np.dtype([("kind", "u1"), ("mode", "u1"), ("points", "<f8", (3, 2))])
+
+
+class ConicScene:
+    """Сцена редактора кривых: по записи фиксированного размера на фигуру в массиве numpy.
+
+    Фигура хранится как тип, режим построения и исходные точки-клики, поэтому её
+    можно заново построить в любом масштабе. Массив растёт удвоением ёмкости.
+    """
+
+    def __init__(self, capacity=64):
+        self.records = np.zeros(max(1, capacity), dtype=RECORD_DTYPE)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for record in self.records[:self.count]:
+            kind = KINDS[record["kind"]]
+            points = [tuple(p) for p in record["points"][:POINTS_PER_KIND[kind]].tolist()]
+            yield kind, MODES[record["mode"]], points
+
+    def add(self, kind, points, mode="Parametric"):
+        if len(points) != POINTS_PER_KIND[kind]:
+            raise ValueError(f"{kind}: нужно точек {POINTS_PER_KIND[kind]}, передано {len(points)}")
+        if self.count == len(self.records):
+            grown = np.zeros(2 * len(self.records), dtype=RECORD_DTYPE)
+            grown[:self.count] = self.records
+            self.records = grown
+        record = self.records[self.count]
+        record["kind"] = KINDS.index(kind)
+        record["mode"] = MODES.index(mode)
+        record["points"] = 0
+        record["points"][:len(points)] = points
+        self.count += 1
+        return self.count - 1
+
+    def clear(self):
+        self.count = 0
+
+    def scaled(self, factor):
+        """Копия сцены, у которой все точки умножены на factor."""
+        scene = ConicScene(self.count)
+        scene.records[:self.count] = self.records[:self.count]
+        scene.records["points"][:self.count] *= factor
+        scene.count = self.count
+        return scene
+
+    def save(self, path):
+        header = np.array([(SCENE_MAGIC, SCENE_VERSION, self.count)], dtype=HEADER_DTYPE)
+        with open(path, "wb") as f:
+            f.write(header.tobytes())
+            f.write(self.records[:self.count].tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER_DTYPE.itemsize:
+            raise ValueError("Файл сцены повреждён: нет заголовка")
+        header = np.frombuffer(data, dtype=HEADER_DTYPE, count=1)[0]
+        if header["magic"] != SCENE_MAGIC or header["version"] != SCENE_VERSION:
+            raise ValueError("Неизвестный формат файла сцены")
+        count = int(header["count"])
+        if len(data) != HEADER_DTYPE.itemsize + count * RECORD_DTYPE.itemsize:
+            raise ValueError("Файл сцены повреждён: неверная длина")
+        scene = cls(count)
+        scene.records[:count] = np.frombuffer(data, dtype=RECORD_DTYPE, count=count, offset=HEADER_DTYPE.itemsize)
+        scene.count = count
+        if count and (scene.records["kind"][:count].max() >= len(KINDS) or scene.records["mode"][:count].max() >= len(MODES)):
+            raise ValueError("Файл сцены повреждён: неизвестный тип фигуры")
+        return scene
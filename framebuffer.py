@@ -0,0 +1,83 @@
+WHITE = (255, 255, 255)
+
+
+def parse_hex_color(color):
+    """Разбирает цвет вида '#rgb' или '#rrggbb' в кортеж (r, g, b). Для имен цветов возвращает None."""
+    if not isinstance(color, str) or not color.startswith("#"):
+        return None
+    digits = color[1:]
+    if len(digits) == 3:
+        digits = "".join(ch * 2 for ch in digits)
+    if len(digits) != 6:
+        return None
+    try:
+        return int(digits[0:2], 16), int(digits[2:4], 16), int(digits[4:6], 16)
+    except ValueError:
+        return None
+
+
+class FrameBuffer:
+    """Внеэкранный RGB-буфер кадра: 3 байта на пиксель, строки подряд."""
+
+    def __init__(self, width, height, background=WHITE):
+        self.width = max(1, int(width))
+        self.height = max(1, int(height))
+        self.background = tuple(background)
+        self.pixels = bytearray(bytes(self.background) * (self.width * self.height))
+
+    def clear(self):
+        self.pixels[:] = bytes(self.background) * (self.width * self.height)
+
+    def resize(self, width, height):
+        """Меняет размер буфера, сохраняя уже нарисованную область."""
+        width, height = max(1, int(width)), max(1, int(height))
+        if width == self.width and height == self.height:
+            return
+        new_pixels = bytearray(bytes(self.background) * (width * height))
+        row_bytes = min(width, self.width) * 3
+        for y in range(min(height, self.height)):
+            src = y * self.width * 3
+            dst = y * width * 3
+            new_pixels[dst:dst + row_bytes] = self.pixels[src:src + row_bytes]
+        self.width, self.height, self.pixels = width, height, new_pixels
+
+    def set_pixel(self, x, y, rgb):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = (y * self.width + x) * 3
+            self.pixels[i] = rgb[0]
+            self.pixels[i + 1] = rgb[1]
+            self.pixels[i + 2] = rgb[2]
+
+    def fill_hspan(self, y, xa, xb, rgb):
+        """Закрашивает горизонтальную серию пикселей [xa, xb] одной операцией среза."""
+        if not 0 <= y < self.height:
+            return
+        xa, xb = max(0, min(xa, xb)), min(self.width - 1, max(xa, xb))
+        if xa > xb:
+            return
+        i = (y * self.width + xa) * 3
+        self.pixels[i:i + (xb - xa + 1) * 3] = bytes(rgb) * (xb - xa + 1)
+
+    def fill_vspan(self, x, ya, yb, rgb):
+        """Закрашивает вертикальную серию пикселей [ya, yb]."""
+        if not 0 <= x < self.width:
+            return
+        ya, yb = max(0, min(ya, yb)), min(self.height - 1, max(ya, yb))
+        stride = self.width * 3
+        for i in range((ya * self.width + x) * 3, (yb * self.width + x) * 3 + 1, stride):
+            self.pixels[i] = rgb[0]
+            self.pixels[i + 1] = rgb[1]
+            self.pixels[i + 2] = rgb[2]
+
+    def get_pixel(self, x, y):
+        i = (y * self.width + x) * 3
+        return self.pixels[i], self.pixels[i + 1], self.pixels[i + 2]
+
+    def to_ppm(self):
+        """Кадр в формате PPM (P6), который tk.PhotoImage принимает через data=."""
+        header = f"P6 {self.width} {self.height} 255\n".encode("ascii")
+        return header + bytes(self.pixels)
+
+    def blit(self, photo):
+        """Одно обновление PhotoImage на весь кадр."""
+        photo.configure(width=self.width, height=self.height, data=self.to_ppm(), format="PPM")
@@ -0,0 +1,251 @@
+import numpy as np
+
+
+def _as_segments(segments):
+    segs = np.asarray(segments, dtype=float)
+    if segs.ndim != 2 or segs.shape[1] != 4:
+        raise ValueError(f"Ожидался массив отрезков формы (N, 4), получено {segs.shape}")
+    return segs
+
+
+def _ragged_arange(counts):
+    """Для каждого отрезка индексы 0..count-1, склеенные в один массив."""
+    total = int(counts.sum())
+    starts = np.cumsum(counts) - counts
+    return np.arange(total) - np.repeat(starts, counts)
+
+
+def _drop_repeats(seg_ids, n_segments, *arrays):
+    """Убирает подряд идущие одинаковые пиксели внутри каждого отрезка."""
+    xs, ys = arrays[0], arrays[1]
+    keep = np.ones(len(xs), dtype=bool)
+    if len(xs) > 1:
+        keep[1:] = (xs[1:] != xs[:-1]) | (ys[1:] != ys[:-1]) | (seg_ids[1:] != seg_ids[:-1])
+    counts = np.bincount(seg_ids[keep], minlength=n_segments)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    return tuple(a[keep] for a in arrays) + (offsets,)
+
+
+def clip_segments(segments, clip_rect):
+    """Пакетное отсечение Лианга-Барски окном (xmin, ymin, xmax, ymax).
+
+    Возвращает (clipped, visible): видимые части отрезков формы (M, 4) и
+    булеву маску длины N, какие отрезки хоть частично попали в окно.
+    """
+    segs = _as_segments(segments)
+    xmin, ymin, xmax, ymax = clip_rect
+    x1, y1, x2, y2 = segs.T
+    dx = x2 - x1
+    dy = y2 - y1
+    t0 = np.zeros(len(segs))
+    t1 = np.ones(len(segs))
+    visible = np.ones(len(segs), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, q in ((-dx, x1 - xmin), (dx, xmax - x1), (-dy, y1 - ymin), (dy, ymax - y1)):
+            parallel = p == 0
+            visible &= ~(parallel & (q < 0))
+            t = q / np.where(parallel, 1.0, p)
+            entering = (p < 0) & ~parallel
+            leaving = (p > 0) & ~parallel
+            t0 = np.where(entering, np.maximum(t0, t), t0)
+            t1 = np.where(leaving, np.minimum(t1, t), t1)
+    visible &= t0 <= t1
+    t0, t1 = t0[visible], t1[visible]
+    x1, y1, dx, dy = x1[visible], y1[visible], dx[visible], dy[visible]
+    clipped = np.column_stack((x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy))
+    # не тронутые отсечением концы оставляем как есть, чтобы не вносить ошибку округления
+    whole = (t0 == 0.0) & (t1 == 1.0)
+    clipped[whole] = segs[visible][whole]
+    return clipped, visible
+
+
+def rasterize_dda_batch(segments):
+    """Пакетный ЦДА. Возвращает (xs, ys, offsets); пиксели отрезка k лежат в [offsets[k], offsets[k+1])."""
+    segs = _as_segments(segments)
+    n = len(segs)
+    x1, y1, x2, y2 = segs.T
+    dx = x2 - x1
+    dy = y2 - y1
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+    moving = steps != 0
+    safe_steps = np.where(moving, steps, 1.0)
+    x_inc = np.where(moving, dx / safe_steps, 0.0)
+    y_inc = np.where(moving, dy / safe_steps, 0.0)
+
+    # i-я точка - x1 + i*x_inc, как в raster_core.iter_dda
+    acc_counts = np.where(moving, steps.astype(np.int64) + 1, 1)
+    acc_ids = np.repeat(np.arange(n), acc_counts)
+    i = _ragged_arange(acc_counts)
+    xs_acc = x1[acc_ids] + i * x_inc[acc_ids]
+    ys_acc = y1[acc_ids] + i * y_inc[acc_ids]
+
+    # после точек шагов идет конечная точка (x2, y2), если отрезок не вырожден
+    raw_counts = acc_counts + moving
+    raw_offsets = np.cumsum(raw_counts) - raw_counts
+    total = int(raw_counts.sum())
+    xs = np.empty(total, dtype=float)
+    ys = np.empty(total, dtype=float)
+    acc_dest = raw_offsets[acc_ids] + i
+    xs[acc_dest] = xs_acc
+    ys[acc_dest] = ys_acc
+    end_dest = (raw_offsets + raw_counts - 1)[moving]
+    xs[end_dest] = x2[moving]
+    ys[end_dest] = y2[moving]
+
+    seg_ids = np.repeat(np.arange(n), raw_counts)
+    px = np.rint(xs).astype(np.int64)
+    py = np.rint(ys).astype(np.int64)
+    return _drop_repeats(seg_ids, n, px, py)
+
+
+def rasterize_dda_fixed_batch(segments, frac_bits=16):
+    """Пакетный ЦДА с фиксированной точкой: i-я точка равна x0 + i*inc в целых, без накопления.
+
+    Совпадает с raster_core.iter_dda_fixed и отличается от ЦДА на float не более чем на пиксель.
+    """
+    segs = _as_segments(segments)
+    n = len(segs)
+    one = 1 << frac_bits
+    half = one >> 1
+    x1, y1, x2, y2 = segs.T
+    dx = x2 - x1
+    dy = y2 - y1
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+    moving = steps != 0
+    safe_steps = np.where(moving, steps, 1.0)
+    x_inc = np.where(moving, np.rint(dx * one / safe_steps), 0).astype(np.int64)
+    y_inc = np.where(moving, np.rint(dy * one / safe_steps), 0).astype(np.int64)
+    x0 = np.rint(x1 * one).astype(np.int64) + half
+    y0 = np.rint(y1 * one).astype(np.int64) + half
+
+    acc_counts = np.where(moving, steps.astype(np.int64) + 1, 1)
+    raw_counts = acc_counts + moving
+    raw_offsets = np.cumsum(raw_counts) - raw_counts
+    acc_ids = np.repeat(np.arange(n), acc_counts)
+    i = _ragged_arange(acc_counts)
+
+    total = int(raw_counts.sum())
+    px = np.empty(total, dtype=np.int64)
+    py = np.empty(total, dtype=np.int64)
+    acc_dest = raw_offsets[acc_ids] + i
+    px[acc_dest] = (x0[acc_ids] + i * x_inc[acc_ids]) >> frac_bits
+    py[acc_dest] = (y0[acc_ids] + i * y_inc[acc_ids]) >> frac_bits
+    # вырожденный отрезок - одна точка round(x1), как в скалярной версии
+    still = ~moving
+    px[raw_offsets[still]] = np.rint(x1[still]).astype(np.int64)
+    py[raw_offsets[still]] = np.rint(y1[still]).astype(np.int64)
+    end_dest = (raw_offsets + raw_counts - 1)[moving]
+    px[end_dest] = np.rint(x2[moving]).astype(np.int64)
+    py[end_dest] = np.rint(y2[moving]).astype(np.int64)
+
+    seg_ids = np.repeat(np.arange(n), raw_counts)
+    return _drop_repeats(seg_ids, n, px, py)
+
+
+def rasterize_bresenham_batch(segments):
+    """Пакетный целочисленный Брезенхем. Возвращает (xs, ys, offsets)."""
+    segs = np.rint(_as_segments(segments)).astype(np.int64)
+    n = len(segs)
+    x1, y1, x2, y2 = segs.T
+    adx = np.abs(x2 - x1)
+    ady = np.abs(y2 - y1)
+    sx = np.where(x1 < x2, 1, -1)
+    sy = np.where(y1 < y2, 1, -1)
+    x_major = adx >= ady
+    d_major = np.where(x_major, adx, ady)
+    d_minor = np.where(x_major, ady, adx)
+
+    counts = d_major + 1
+    seg_ids = np.repeat(np.arange(n), counts)
+    i = _ragged_arange(counts)
+    d_major_r = d_major[seg_ids]
+    # номер шага по второстепенной оси совпадает с решением цикла по ошибке err
+    k = (2 * i * d_minor[seg_ids] + d_major_r) // np.maximum(2 * d_major_r, 1)
+    x_major_r = x_major[seg_ids]
+    xs = x1[seg_ids] + sx[seg_ids] * np.where(x_major_r, i, k)
+    ys = y1[seg_ids] + sy[seg_ids] * np.where(x_major_r, k, i)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    return xs, ys, offsets
+
+
+def rasterize_wu_batch(segments):
+    """Пакетный алгоритм Ву. Возвращает (xs, ys, intensities, offsets)."""
+    segs = _as_segments(segments)
+    n = len(segs)
+    x1, y1, x2, y2 = (c.copy() for c in segs.T)
+    dx = x2 - x1
+    dy = y2 - y1
+    steep = np.abs(dy) > np.abs(dx)
+
+    x1, y1 = np.where(steep, y1, x1), np.where(steep, x1, y1)
+    x2, y2 = np.where(steep, y2, x2), np.where(steep, x2, y2)
+    dx, dy = np.where(steep, dy, dx), np.where(steep, dx, dy)
+
+    flip = x1 > x2
+    x1, x2 = np.where(flip, x2, x1), np.where(flip, x1, x2)
+    y1, y2 = np.where(flip, y2, y1), np.where(flip, y1, y2)
+    dx = np.where(flip, -dx, dx)
+    dy = np.where(flip, -dy, dy)
+
+    gradient = np.where(dx != 0, dy / np.where(dx != 0, dx, 1.0), 1.0)
+
+    def fpart(v):
+        return v - np.floor(v)
+
+    xend1 = np.floor(x1 + 0.5)
+    yend1 = y1 + gradient * (xend1 - x1)
+    xgap1 = 1.0 - fpart(x1 + 0.5)
+    ypxl1 = np.floor(yend1)
+
+    xend2 = np.floor(x2 + 0.5)
+    yend2 = y2 + gradient * (xend2 - x2)
+    xgap2 = fpart(x2 + 0.5)
+    ypxl2 = np.floor(yend2)
+
+    inner_counts = np.maximum(xend2 - xend1 - 1, 0).astype(np.int64)
+    inner_ids = np.repeat(np.arange(n), inner_counts)
+    inner_step = 1 + _ragged_arange(inner_counts)
+    inner_x = xend1[inner_ids] + inner_step
+    # пересечение от начала для каждого столбца, как в raster_core._iter_wu_raw
+    interys = yend1[inner_ids] + gradient[inner_ids] * inner_step
+    inner_y = np.floor(interys)
+
+    raw_counts = 4 + 2 * inner_counts
+    raw_offsets = np.cumsum(raw_counts) - raw_counts
+    total = int(raw_counts.sum())
+    xs = np.empty(total, dtype=float)
+    ys = np.empty(total, dtype=float)
+    vals = np.empty(total, dtype=float)
+
+    ends = (
+        (xend1, ypxl1, (1.0 - fpart(yend1)) * xgap1),
+        (xend1, ypxl1 + 1, fpart(yend1) * xgap1),
+        (xend2, ypxl2, (1.0 - fpart(yend2)) * xgap2),
+        (xend2, ypxl2 + 1, fpart(yend2) * xgap2),
+    )
+    for j, (ex, ey, ev) in enumerate(ends):
+        xs[raw_offsets + j] = ex
+        ys[raw_offsets + j] = ey
+        vals[raw_offsets + j] = ev
+
+    inner_dest = raw_offsets[inner_ids] + 4 + 2 * _ragged_arange(inner_counts)
+    xs[inner_dest] = inner_x
+    ys[inner_dest] = inner_y
+    vals[inner_dest] = 1.0 - fpart(interys)
+    xs[inner_dest + 1] = inner_x
+    ys[inner_dest + 1] = inner_y + 1
+    vals[inner_dest + 1] = fpart(interys)
+
+    seg_ids = np.repeat(np.arange(n), raw_counts)
+    steep_r = steep[seg_ids]
+    px = np.where(steep_r, ys, xs).astype(np.int64)
+    py = np.where(steep_r, xs, ys).astype(np.int64)
+    return _drop_repeats(seg_ids, n, px, py, vals)
+
+
+BATCH_RASTERIZERS = {
+    "DDA": rasterize_dda_batch,
+    "DDA-fixed": rasterize_dda_fixed_batch,
+    "Bresenham": rasterize_bresenham_batch,
+    "Wu": rasterize_wu_batch,
+}
@@ -0,0 +1,80 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from framebuffer import FrameBuffer
+from raster_core import RASTERIZERS, WuBlendCache, pixel_clip_rect, to_rgb
+
+MIN_SEGMENTS_PER_WORKER = 256
+
+
+def _rasterize_chunk(args):
+    """Рисует часть отрезков в локальную карту покрытия (0..255 на пиксель).
+
+    Выполняется в отдельном процессе, поэтому функция объявлена на уровне модуля.
+    """
+    segments, width, height, algorithm = args
+    coverage = bytearray(width * height)
+    clip_rect = pixel_clip_rect(width, height, algorithm)
+
+    def plot_intensity(px, py, intensity, color):
+        if 0 <= px < width and 0 <= py < height:
+            i = py * width + px
+            value = int(intensity * 255 + 0.5)
+            if value > coverage[i]:
+                coverage[i] = value
+
+    def plot(px, py, color):
+        if 0 <= px < width and 0 <= py < height:
+            coverage[py * width + px] = 255
+
+    rasterizer = RASTERIZERS[algorithm]
+    plotter = plot_intensity if algorithm == "Wu" else plot
+    for x1, y1, x2, y2 in segments:
+        rasterizer(x1, y1, x2, y2, None, plotter, False, clip_rect)
+    return bytes(coverage)
+
+
+def _split(segments, parts):
+    size = max(1, -(-len(segments) // parts))
+    return [segments[i:i + size] for i in range(0, len(segments), size)]
+
+
+def rasterize_coverage_parallel(segments, width, height, algorithm="DDA", workers=None):
+    """Растеризует отрезки в пуле процессов и сводит результат в карту покрытия (height, width) uint8.
+
+    Перекрывающиеся пиксели объединяются по максимуму интенсивности, поэтому
+    результат не зависит от того, как отрезки разбиты по процессам.
+    """
+    if algorithm not in RASTERIZERS:
+        raise ValueError(f"Неизвестный алгоритм: {algorithm}")
+    segments = [tuple(map(float, s)) for s in segments]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(segments) // MIN_SEGMENTS_PER_WORKER))
+
+    coverage = np.zeros((height, width), dtype=np.uint8)
+    if not segments:
+        return coverage
+
+    if workers == 1:
+        results = [_rasterize_chunk((segments, width, height, algorithm))]
+    else:
+        jobs = [(chunk, width, height, algorithm) for chunk in _split(segments, workers * 4)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_rasterize_chunk, jobs)
+
+    for data in results:
+        np.maximum(coverage, np.frombuffer(data, dtype=np.uint8).reshape(height, width), out=coverage)
+    return coverage
+
+
+def render_lines_parallel(width, height, segments, algorithm="DDA", color=(0, 0, 0),
+                          background=(255, 255, 255), workers=None):
+    """Параллельный аналог raster_core.render_lines: возвращает готовый FrameBuffer."""
+    coverage = rasterize_coverage_parallel(segments, width, height, algorithm, workers)
+    table = np.array(WuBlendCache().table(to_rgb(color), tuple(background)), dtype=np.uint8)
+    framebuffer = FrameBuffer(width, height, background)
+    framebuffer.pixels[:] = table[coverage].tobytes()
+    return framebuffer
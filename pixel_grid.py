@@ -0,0 +1,135 @@
+import math
+
+from framebuffer import FrameBuffer
+
+GRID_BACKGROUND = (224, 224, 224)
+GRID_LINE_COLOR = (176, 176, 176)
+GRID_AXIS_COLOR = (255, 0, 0)
+MIN_CELL_SIZE = 1
+MAX_CELL_SIZE = 64
+# при меньших ячейках линии сетки закрыли бы сами пиксели
+MIN_LINED_CELL_SIZE = 4
+
+
+class PixelGrid:
+    """Отладочная сетка пикселей, которая выводится одним изображением.
+
+    Ячейки хранятся по логическим координатам (координатам пикселя на холсте
+    редактора), а вид задаётся размером ячейки и логической точкой в левом
+    верхнем углу. Новая ячейка дорисовывается в готовый кадр на месте; при
+    зуме и сдвиге кадр пересобирается только по видимой области.
+    """
+
+    def __init__(self, width, height, cell_size=20, background=GRID_BACKGROUND,
+                 line_color=GRID_LINE_COLOR, axis_color=GRID_AXIS_COLOR):
+        self.framebuffer = FrameBuffer(width, height, background)
+        self.cell_size = cell_size
+        self.origin = (0.0, 0.0)
+        self.axes = None
+        self.line_color = line_color
+        self.axis_color = axis_color
+        self.cells = {}
+        self.dirty = True
+
+    @property
+    def width(self):
+        return self.framebuffer.width
+
+    @property
+    def height(self):
+        return self.framebuffer.height
+
+    def resize(self, width, height):
+        self.framebuffer.resize(width, height)
+        self.dirty = True
+
+    def center_on(self, gx, gy):
+        cs = self.cell_size
+        self.origin = (gx + 0.5 - self.width / cs / 2, gy + 0.5 - self.height / cs / 2)
+        self.dirty = True
+
+    def fit(self, gx0, gy0, gx1, gy1):
+        """Подбирает размер ячейки и сдвиг так, чтобы прямоугольник ячеек целиком был виден."""
+        span = max(gx1 - gx0 + 1, gy1 - gy0 + 1)
+        self.cell_size = max(MIN_CELL_SIZE, min(MAX_CELL_SIZE, min(self.width, self.height) // span))
+        self.center_on((gx0 + gx1) / 2, (gy0 + gy1) / 2)
+
+    def zoom_at(self, factor, sx, sy):
+        """Масштабирует вид так, чтобы ячейка под экранной точкой (sx, sy) осталась на месте."""
+        cs = self.cell_size
+        new_cs = max(MIN_CELL_SIZE, min(MAX_CELL_SIZE, round(cs * factor)))
+        if new_cs == cs:
+            new_cs = max(MIN_CELL_SIZE, min(MAX_CELL_SIZE, cs + (1 if factor > 1 else -1)))
+        ox, oy = self.origin
+        lx, ly = ox + sx / cs, oy + sy / cs
+        self.cell_size = new_cs
+        self.origin = (lx - sx / new_cs, ly - sy / new_cs)
+        self.dirty = True
+
+    def pan(self, dx, dy):
+        """Сдвигает вид на (dx, dy) экранных пикселей."""
+        ox, oy = self.origin
+        self.origin = (ox - dx / self.cell_size, oy - dy / self.cell_size)
+        self.dirty = True
+
+    def to_screen(self, gx, gy):
+        """Левый верхний угол ячейки на экране."""
+        ox, oy = self.origin
+        return math.floor((gx - ox) * self.cell_size), math.floor((gy - oy) * self.cell_size)
+
+    def cell_at(self, sx, sy):
+        ox, oy = self.origin
+        return math.floor(ox + sx / self.cell_size), math.floor(oy + sy / self.cell_size)
+
+    def set_cell(self, gx, gy, rgb):
+        self.cells[(gx, gy)] = rgb
+        if not self.dirty:
+            self._paint_cell(gx, gy, rgb)
+
+    def clear_cells(self):
+        self.cells.clear()
+        self.dirty = True
+
+    def _paint_cell(self, gx, gy, rgb):
+        cs = self.cell_size
+        inset = 1 if cs >= MIN_LINED_CELL_SIZE else 0
+        x0, y0 = self.to_screen(gx, gy)
+        if x0 + cs <= 0 or y0 + cs <= 0 or x0 >= self.width or y0 >= self.height:
+            return
+        for y in range(max(0, y0 + inset), min(self.height, y0 + cs)):
+            self.framebuffer.fill_hspan(y, x0 + inset, x0 + cs - 1, rgb)
+
+    def render(self):
+        """Возвращает кадр; пересобирает его, только если менялись зум, сдвиг или ячейки удалялись."""
+        if not self.dirty:
+            return self.framebuffer
+        fb = self.framebuffer
+        fb.clear()
+        cs = self.cell_size
+        gx0, gy0 = self.cell_at(0, 0)
+        gx1, gy1 = self.cell_at(self.width - 1, self.height - 1)
+
+        if cs >= MIN_LINED_CELL_SIZE:
+            for gx in range(gx0, gx1 + 2):
+                fb.fill_vspan(self.to_screen(gx, 0)[0], 0, self.height - 1, self.line_color)
+            for gy in range(gy0, gy1 + 2):
+                fb.fill_hspan(self.to_screen(0, gy)[1], 0, self.width - 1, self.line_color)
+        if self.axes is not None:
+            ax, ay = self.to_screen(*self.axes)
+            fb.fill_vspan(ax + cs // 2, 0, self.height - 1, self.axis_color)
+            fb.fill_hspan(ay + cs // 2, 0, self.width - 1, self.axis_color)
+
+        # обходим либо все ячейки, либо только видимые - что короче
+        visible = (gx1 - gx0 + 1) * (gy1 - gy0 + 1)
+        if len(self.cells) <= visible:
+            for (gx, gy), rgb in self.cells.items():
+                if gx0 <= gx <= gx1 and gy0 <= gy <= gy1:
+                    self._paint_cell(gx, gy, rgb)
+        else:
+            for gy in range(gy0, gy1 + 1):
+                for gx in range(gx0, gx1 + 1):
+                    rgb = self.cells.get((gx, gy))
+                    if rgb is not None:
+                        self._paint_cell(gx, gy, rgb)
+        self.dirty = False
+        return fb
@@ -0,0 +1,115 @@
+import math
+
+JOINS = ("miter", "round", "bevel")
+
+
+def _add_polygon_spans(rows, polygon):
+    """Добавляет в rows горизонтальные интервалы выпуклого многоугольника (по центрам пикселей)."""
+    ys = [p[1] for p in polygon]
+    y_start, y_end = math.ceil(min(ys)), math.floor(max(ys))
+    edges = list(zip(polygon, polygon[1:] + polygon[:1]))
+    for y in range(y_start, y_end + 1):
+        x_min, x_max = math.inf, -math.inf
+        for (xa, ya), (xb, yb) in edges:
+            if ya == yb:
+                if ya == y:
+                    x_min = min(x_min, xa, xb)
+                    x_max = max(x_max, xa, xb)
+                continue
+            if (ya <= y <= yb) or (yb <= y <= ya):
+                x = xa + (y - ya) * (xb - xa) / (yb - ya)
+                x_min = min(x_min, x)
+                x_max = max(x_max, x)
+        x0, x1 = math.ceil(x_min), math.floor(x_max)
+        if x0 <= x1:
+            rows.setdefault(y, []).append((x0, x1))
+
+
+def _add_disc_spans(rows, cx, cy, radius):
+    for y in range(math.ceil(cy - radius), math.floor(cy + radius) + 1):
+        half = math.sqrt(max(0.0, radius * radius - (y - cy) ** 2))
+        x0, x1 = math.ceil(cx - half), math.floor(cx + half)
+        if x0 <= x1:
+            rows.setdefault(y, []).append((x0, x1))
+
+
+def _add_join(rows, vertex, n0, n1, d0, d1, half_width, join, miter_limit):
+    cross = d0[0] * d1[1] - d0[1] * d1[0]
+    if abs(cross) < 1e-12 and d0[0] * d1[0] + d0[1] * d1[1] > 0:
+        return
+    vx, vy = vertex
+    if join == "round":
+        _add_disc_spans(rows, vx, vy, half_width)
+        return
+
+    side = -1.0 if cross > 0 else 1.0
+    a = (vx + side * half_width * n0[0], vy + side * half_width * n0[1])
+    b = (vx + side * half_width * n1[0], vy + side * half_width * n1[1])
+    if join == "miter":
+        denom = 1.0 + n0[0] * n1[0] + n0[1] * n1[1]
+        if denom > 1e-12:
+            mx = (n0[0] + n1[0]) / denom
+            my = (n0[1] + n1[1]) / denom
+            if math.hypot(mx, my) <= miter_limit:
+                tip = (vx + side * half_width * mx, vy + side * half_width * my)
+                _add_polygon_spans(rows, [vertex, a, tip, b])
+                return
+    _add_polygon_spans(rows, [vertex, a, b])
+
+
+def merge_row_spans(rows):
+    """Сливает перекрывающиеся и соседние интервалы каждой строки: каждый пиксель встречается один раз."""
+    spans = []
+    for y in sorted(rows):
+        intervals = sorted(rows[y])
+        cur0, cur1 = intervals[0]
+        for x0, x1 in intervals[1:]:
+            if x0 <= cur1 + 1:
+                if x1 > cur1:
+                    cur1 = x1
+            else:
+                spans.append((y, cur0, cur1))
+                cur0, cur1 = x0, x1
+        spans.append((y, cur0, cur1))
+    return spans
+
+
+def polyline_spans(points, width=1.0, join="miter", miter_limit=4.0):
+    """Растеризует толстую ломаную в список горизонтальных серий (y, x0, x1).
+
+    Сегменты - прямоугольники шириной width, во внутренних вершинах добавляется
+    соединение miter/round/bevel; концы ломаной обрезаны прямо. Интервалы всех
+    фигур сливаются по строкам, поэтому пиксели в местах стыков не повторяются.
+    """
+    if join not in JOINS:
+        raise ValueError(f"Неизвестный тип соединения: {join}")
+
+    pts = []
+    for x, y in points:
+        if not pts or (x, y) != pts[-1]:
+            pts.append((float(x), float(y)))
+    if len(pts) < 2:
+        return []
+
+    half_width = max(0.5, width / 2.0)
+    rows = {}
+    dirs, normals = [], []
+    for (xa, ya), (xb, yb) in zip(pts, pts[1:]):
+        length = math.hypot(xb - xa, yb - ya)
+        d = ((xb - xa) / length, (yb - ya) / length)
+        n = (-d[1], d[0])
+        dirs.append(d)
+        normals.append(n)
+        ox, oy = n[0] * half_width, n[1] * half_width
+        _add_polygon_spans(rows, [(xa + ox, ya + oy), (xb + ox, yb + oy), (xb - ox, yb - oy), (xa - ox, ya - oy)])
+
+    for i in range(1, len(pts) - 1):
+        _add_join(rows, pts[i], normals[i - 1], normals[i], dirs[i - 1], dirs[i], half_width, join, miter_limit)
+
+    return merge_row_spans(rows)
+
+
+def fill_spans(framebuffer, spans, rgb):
+    """Закрашивает в буфере кадра строки (y, x0, x1), которые возвращает polyline_spans."""
+    for y, x0, x1 in spans:
+        framebuffer.fill_hspan(y, x0, x1, rgb)
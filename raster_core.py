@@ -0,0 +1,507 @@
+import math
+from collections import OrderedDict
+
+from clipping import clip_line_params
+from framebuffer import FrameBuffer, parse_hex_color
+
+
+FIXED_FRAC_BITS = 16
+FIXED_ONE = 1 << FIXED_FRAC_BITS
+FIXED_HALF = FIXED_ONE >> 1
+
+
+def _no_plot(*args):
+    pass
+
+
+def _step_span(x1, y1, x2, y2, steps, clip_rect):
+    """Шаги first..last отрезка из steps шагов, на которых он может попасть в окно clip_rect.
+
+    Шаг i - точка с параметром t = i / steps исходного отрезка; границы берутся
+    с запасом в шаг, лишние пиксели отбрасывает проверка границ при записи.
+    Возвращает (first, last, end_visible) или None, если отрезок вне окна;
+    end_visible - лежит ли в окне конечная точка.
+    """
+    last = int(steps)
+    if clip_rect is None:
+        return 0, last, True
+    span = clip_line_params(x1, y1, x2, y2, clip_rect)
+    if span is None:
+        return None
+    t0, t1 = span
+    return max(0, math.floor(t0 * steps)), min(last, math.ceil(t1 * steps)), t1 == 1.0
+
+
+def iter_dda(x1, y1, x2, y2, clip_rect=None):
+    """Пиксели ЦДА по одному, без повторов подряд. Память не зависит от длины отрезка.
+
+    Точка i-го шага считается как x1 + i*x_increment, а не накоплением, поэтому
+    с clip_rect обход начинается сразу с первого видимого шага и дает те же
+    пиксели, что и весь отрезок.
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+
+    steps = max(abs(dx), abs(dy))
+    span = _step_span(x1, y1, x2, y2, steps, clip_rect)
+    if span is None:
+        return
+    if steps == 0:
+        yield round(x1), round(y1)
+        return
+    first, last_step, end_visible = span
+
+    x_increment = dx / steps
+    y_increment = dy / steps
+
+    last = None
+    for i in range(first, last_step + 1):
+        pixel = (round(x1 + i * x_increment), round(y1 + i * y_increment))
+        if pixel != last:
+            yield pixel
+            last = pixel
+
+    pixel = (round(x2), round(y2))
+    if end_visible and pixel != last:
+        yield pixel
+
+
+def iter_dda_fixed(x1, y1, x2, y2, clip_rect=None):
+    """ЦДА на целых числах в формате 16.16 вместо float и round() на каждом шаге.
+
+    Приращение округляется до 1/65536, поэтому за n шагов координата уходит от
+    точной не более чем на (n + 1) / 131072 пикселя. Для отрезков короче 65535
+    пикселей это меньше половины пикселя, и каждый пиксель отличается от iter_dda
+    не более чем на один по каждой оси (на половинках округляется вверх, а не к четному).
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+
+    steps = max(abs(dx), abs(dy))
+    span = _step_span(x1, y1, x2, y2, steps, clip_rect)
+    if span is None:
+        return
+    if steps == 0:
+        yield round(x1), round(y1)
+        return
+    first, last_step, end_visible = span
+
+    x_increment = round(dx * FIXED_ONE / steps)
+    y_increment = round(dy * FIXED_ONE / steps)
+
+    x = round(x1 * FIXED_ONE) + FIXED_HALF + first * x_increment
+    y = round(y1 * FIXED_ONE) + FIXED_HALF + first * y_increment
+
+    last = None
+    for i in range(first, last_step + 1):
+        pixel = (x >> FIXED_FRAC_BITS, y >> FIXED_FRAC_BITS)
+        if pixel != last:
+            yield pixel
+            last = pixel
+        x += x_increment
+        y += y_increment
+
+    pixel = (round(x2), round(y2))
+    if end_visible and pixel != last:
+        yield pixel
+
+
+def iter_bresenham(x1, y1, x2, y2, clip_rect=None):
+    """Пиксели целочисленного алгоритма Брезенхема по одному.
+
+    С clip_rect обход начинается с первого видимого шага по главной оси; ошибка
+    для него считается в замкнутом виде, как в bresenham_two_ended.
+    """
+    if clip_rect is not None:
+        yield from _iter_bresenham_span(x1, y1, x2, y2, clip_rect)
+        return
+    x1, y1, x2, y2 = int(round(x1)), int(round(y1)), int(round(x2)), int(round(y2))
+
+    dx = abs(x2 - x1)
+    dy = -abs(y2 - y1)
+
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+
+    err = dx + dy
+    x, y = x1, y1
+
+    while True:
+        yield x, y
+
+        if x == x2 and y == y2:
+            break
+        e2 = 2 * err
+        if e2 >= dy:
+            if x == x2: break
+            err += dy
+            x += sx
+        if e2 <= dx:
+            if y == y2: break
+            err += dx
+            y += sy
+
+
+def _bresenham_params(x1, y1, x2, y2):
+    x1, y1, x2, y2 = int(round(x1)), int(round(y1)), int(round(x2)), int(round(y2))
+    adx, ady = abs(x2 - x1), abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    x_major = adx >= ady
+    d_major, d_minor = (adx, ady) if x_major else (ady, adx)
+    return x1, y1, sx, sy, x_major, d_major, d_minor
+
+
+def _bresenham_step_span(x1, y1, sx, sy, x_major, d_major, d_minor, clip_rect):
+    """Шаги по главной оси (first, last) округленного отрезка, видимые в clip_rect, или None."""
+    if x_major:
+        x2, y2 = x1 + sx * d_major, y1 + sy * d_minor
+    else:
+        x2, y2 = x1 + sx * d_minor, y1 + sy * d_major
+    span = _step_span(x1, y1, x2, y2, d_major, clip_rect)
+    return None if span is None else span[:2]
+
+
+def _iter_bresenham_span(x1, y1, x2, y2, clip_rect):
+    x1, y1, sx, sy, x_major, d_major, d_minor = params = _bresenham_params(x1, y1, x2, y2)
+    span = _bresenham_step_span(*params, clip_rect)
+    if span is None:
+        return
+    first, last = span
+    two_major, two_minor = 2 * d_major, 2 * d_minor
+    k, rem = divmod(2 * first * d_minor + d_major, max(two_major, 1))
+    for i in range(first, last + 1):
+        yield (x1 + sx * i, y1 + sy * k) if x_major else (x1 + sx * k, y1 + sy * i)
+        rem += two_minor
+        if rem >= two_major:
+            rem -= two_major
+            k += 1
+
+
+def bresenham_two_ended(x1, y1, x2, y2, clip_rect=None):
+    """Брезенхем с двух концов к середине: те же пиксели, что iter_bresenham, за ~n/2 итераций.
+
+    Шаг по второстепенной оси для i-го пикселя равен (2*i*d_minor + d_major) // (2*d_major);
+    с обоих концов он ведется целочисленным остатком, поэтому совпадение точное.
+    С clip_rect концами служат крайние видимые шаги.
+    """
+    x1, y1, sx, sy, x_major, d_major, d_minor = params = _bresenham_params(x1, y1, x2, y2)
+    span = _bresenham_step_span(*params, clip_rect)
+    if span is None:
+        return []
+    if d_major == 0:
+        return [(x1, y1)]
+
+    two_major, two_minor = 2 * d_major, 2 * d_minor
+    i_front, i_back = span
+    k_front, rem_front = divmod(2 * i_front * d_minor + d_major, two_major)
+    k_back, rem_back = divmod(2 * i_back * d_minor + d_major, two_major)
+    front, back = [], []
+
+    while i_front < i_back:
+        if x_major:
+            front.append((x1 + sx * i_front, y1 + sy * k_front))
+            back.append((x1 + sx * i_back, y1 + sy * k_back))
+        else:
+            front.append((x1 + sx * k_front, y1 + sy * i_front))
+            back.append((x1 + sx * k_back, y1 + sy * i_back))
+
+        i_front += 1
+        rem_front += two_minor
+        if rem_front >= two_major:
+            rem_front -= two_major
+            k_front += 1
+
+        i_back -= 1
+        rem_back -= two_minor
+        if rem_back < 0:
+            rem_back += two_major
+            k_back -= 1
+
+    if i_front == i_back:
+        front.append((x1 + sx * i_front, y1 + sy * k_front) if x_major else (x1 + sx * k_front, y1 + sy * i_front))
+    back.reverse()
+    return front + back
+
+
+def iter_bresenham_runs(x1, y1, x2, y2, clip_rect=None):
+    """Брезенхем по сериям: за итерацию - целый горизонтальный или вертикальный отрезок (xa, ya, xb, yb).
+
+    Серии идут от начала к концу и вместе дают ровно пиксели iter_bresenham;
+    с clip_rect крайние серии обрезаются по видимым шагам.
+    """
+    x1, y1, sx, sy, x_major, d_major, d_minor = params = _bresenham_params(x1, y1, x2, y2)
+    span = _bresenham_step_span(*params, clip_rect)
+    if span is None:
+        return
+    first, last = span
+    if d_minor == 0:
+        if x_major:
+            yield x1 + sx * first, y1, x1 + sx * last, y1
+        else:
+            yield x1, y1 + sy * first, x1, y1 + sy * last
+        return
+
+    two_major = 2 * d_major
+    start = first
+    for k in range((2 * first * d_minor + d_major) // two_major, (2 * last * d_minor + d_major) // two_major + 1):
+        # первый индекс следующей серии: ceil((2k + 1) * d_major / (2 * d_minor))
+        end = -(-(2 * k + 1) * d_major // (2 * d_minor)) - 1 if k < d_minor else d_major
+        end = min(end, last)
+        if x_major:
+            yield x1 + sx * start, y1 + sy * k, x1 + sx * end, y1 + sy * k
+        else:
+            yield x1 + sx * k, y1 + sy * start, x1 + sx * k, y1 + sy * end
+        start = end + 1
+
+
+def _iter_wu_raw(x1, y1, x2, y2, clip_rect=None):
+    dx = x2 - x1
+    dy = y2 - y1
+    steep = abs(dy) > abs(dx)
+
+    if steep:
+        x1, y1 = y1, x1
+        x2, y2 = y2, x2
+        dx, dy = dy, dx
+        if clip_rect is not None:
+            xmin, ymin, xmax, ymax = clip_rect
+            clip_rect = ymin, xmin, ymax, xmax
+
+    if x1 > x2:
+        x1, x2 = x2, x1
+        y1, y2 = y2, y1
+        dx = -dx
+        dy = -dy
+
+    # видимые столбцы по главной оси; концы рисуются, только если лежат в окне
+    x_lo, x_hi, show_start, show_end = -math.inf, math.inf, True, True
+    if clip_rect is not None:
+        span = clip_line_params(x1, y1, x2, y2, clip_rect)
+        if span is None:
+            return
+        t0, t1 = span
+        x_lo, x_hi = math.floor(x1 + t0 * dx), math.ceil(x1 + t1 * dx)
+        show_start, show_end = t0 == 0.0, t1 == 1.0
+
+    gradient = dy / dx if dx != 0 else 1.0
+
+    def ipart(x): return math.floor(x)
+    def round_coord(x): return ipart(x + 0.5)
+    def fpart(x): return x - math.floor(x)
+    def rfpart(x): return 1.0 - fpart(x)
+
+    def pixel(x, y, intensity):
+        return (int(y), int(x), intensity) if steep else (int(x), int(y), intensity)
+
+    xend = round_coord(x1)
+    yend = y1 + gradient * (xend - x1)
+    xgap = rfpart(x1 + 0.5)
+    xpxl1 = xend
+    ypxl1 = ipart(yend)
+    yend1 = yend
+
+    if show_start:
+        yield pixel(xpxl1, ypxl1, rfpart(yend) * xgap)
+        yield pixel(xpxl1, ypxl1 + 1, fpart(yend) * xgap)
+
+    xend = round_coord(x2)
+    yend = y2 + gradient * (xend - x2)
+    xgap = fpart(x2 + 0.5)
+    xpxl2 = xend
+    ypxl2 = ipart(yend)
+
+    if show_end:
+        yield pixel(xpxl2, ypxl2, rfpart(yend) * xgap)
+        yield pixel(xpxl2, ypxl2 + 1, fpart(yend) * xgap)
+
+    # пересечение считается от начала для каждого столбца, а не накоплением,
+    # поэтому обход с первого видимого столбца дает те же пиксели
+    for x in range(int(max(xpxl1 + 1, x_lo)), int(min(xpxl2, x_hi + 1))):
+        intery = yend1 + gradient * (x - xpxl1)
+        y_coord = ipart(intery)
+        yield pixel(x, y_coord, rfpart(intery))
+        yield pixel(x, y_coord + 1, fpart(intery))
+
+
+def iter_wu(x1, y1, x2, y2, clip_rect=None):
+    """Пиксели алгоритма Ву в виде (x, y, intensity) по одному, без повторов подряд."""
+    last_x = last_y = None
+    for px, py, intensity in _iter_wu_raw(x1, y1, x2, y2, clip_rect):
+        if px != last_x or py != last_y:
+            yield px, py, intensity
+            last_x, last_y = px, py
+
+
+def iter_chunks(pixels, size=4096):
+    """Группирует поток пикселей в списки не длиннее size."""
+    chunk = []
+    for pixel in pixels:
+        chunk.append(pixel)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def rasterize_dda(x1, y1, x2, y2, color="black", plot_pixel_func=None, collect_steps=False, clip_rect=None,
+                  fixed_point=False):
+    steps_data = []
+    if plot_pixel_func is None:
+        plot_pixel_func = _no_plot
+    pixels = iter_dda_fixed(x1, y1, x2, y2, clip_rect) if fixed_point else iter_dda(x1, y1, x2, y2, clip_rect)
+    for px, py in pixels:
+        plot_pixel_func(px, py, color)
+        if collect_steps: steps_data.append((px, py))
+    return steps_data
+
+
+def rasterize_bresenham(x1, y1, x2, y2, color="black", plot_pixel_func=None, collect_steps=False, clip_rect=None,
+                        two_ended=False):
+    steps_data = []
+    if plot_pixel_func is None:
+        plot_pixel_func = _no_plot
+    if two_ended:
+        pixels = bresenham_two_ended(x1, y1, x2, y2, clip_rect)
+    else:
+        pixels = iter_bresenham(x1, y1, x2, y2, clip_rect)
+    for px, py in pixels:
+        plot_pixel_func(px, py, color)
+        if collect_steps: steps_data.append((px, py))
+    return steps_data
+
+
+def rasterize_wu(x1, y1, x2, y2, color="black", plot_pixel_func_intensity=None, collect_steps=False, clip_rect=None):
+    steps_data = []
+    if plot_pixel_func_intensity is None:
+        plot_pixel_func_intensity = _no_plot
+    for px, py, intensity in iter_wu(x1, y1, x2, y2, clip_rect):
+        plot_pixel_func_intensity(px, py, intensity, color)
+        if collect_steps: steps_data.append((px, py, intensity))
+    return steps_data
+
+
+RASTERIZERS = {
+    "DDA": rasterize_dda,
+    "Bresenham": rasterize_bresenham,
+    "Wu": rasterize_wu,
+}
+
+PIXEL_ITERATORS = {
+    "DDA": iter_dda,
+    "DDA-fixed": iter_dda_fixed,
+    "Bresenham": iter_bresenham,
+    "Wu": iter_wu,
+}
+
+
+def iter_line(algorithm, x1, y1, x2, y2, clip_rect=None):
+    """Поток пикселей выбранного алгоритма; с clip_rect обходятся только шаги, видимые в окне.
+
+    Отсечение идет в шагах самого алгоритма от исходных концов, поэтому
+    пиксели внутри окна те же, что у неотсеченного отрезка.
+    """
+    return PIXEL_ITERATORS[algorithm](x1, y1, x2, y2, clip_rect)
+
+
+def to_rgb(color):
+    """Цвет в виде кортежа (r, g, b). Без Tk понимаются только кортежи и строки '#rrggbb'."""
+    if isinstance(color, tuple):
+        return color
+    rgb = parse_hex_color(color)
+    if rgb is None:
+        raise ValueError(f"Цвет {color!r} нельзя разобрать без Tk, используйте '#rrggbb' или (r, g, b)")
+    return rgb
+
+
+def blend(base_rgb, background_rgb, intensity):
+    """Смешивание цвета линии с фоном, как в плоттере Ву редактора."""
+    return tuple(max(0, min(255, int(c * intensity + bg * (1 - intensity))))
+                 for c, bg in zip(base_rgb, background_rgb))
+
+
+class WuBlendCache:
+    """Таблицы смешивания для Ву: для каждого базового цвета заранее готовы levels уровней яркости.
+
+    Таблицы хранятся в LRU на max_colors цветов; resolve вызывается только при
+    промахе, поэтому цвет разбирается (в редакторе - через Tcl) один раз на цвет.
+    """
+
+    def __init__(self, max_colors=32, levels=256, resolve=to_rgb):
+        self.max_colors = max_colors
+        self.levels = levels
+        self.resolve = resolve
+        self.tables = OrderedDict()
+
+    def table(self, color, background=(255, 255, 255)):
+        key = (color, background)
+        table = self.tables.get(key)
+        if table is not None:
+            self.tables.move_to_end(key)
+            return table
+        base = self.resolve(color)
+        top = self.levels - 1
+        table = [blend(base, background, level / top) for level in range(self.levels)]
+        self.tables[key] = table
+        if len(self.tables) > self.max_colors:
+            self.tables.popitem(last=False)
+        return table
+
+    def lookup(self, color, intensity, background=(255, 255, 255)):
+        table = self.table(color, background)
+        level = int(intensity * (self.levels - 1) + 0.5)
+        return table[max(0, min(self.levels - 1, level))]
+
+
+_blend_cache = WuBlendCache()
+
+
+def pixel_clip_rect(width, height, algorithm=None):
+    """Окно отсечения для растра width x height с запасом в пиксель за крайними центрами.
+
+    Пиксель попадает в растр, если точка отрезка на его шаге лежит не дальше
+    полупикселя от растра, поэтому окно по центрам крайних пикселей пропускало
+    бы шаги у края. Ву рисует еще и соседний пиксель, поэтому для него запас
+    два пикселя. Лишнее отбрасывает проверка границ при записи пикселя.
+    """
+    margin = 2 if algorithm == "Wu" else 1
+    return -margin, -margin, width - 1 + margin, height - 1 + margin
+
+
+def render_line(framebuffer, algorithm, x1, y1, x2, y2, color=(0, 0, 0), collect_steps=False):
+    """Рисует отрезок выбранным алгоритмом прямо в FrameBuffer и возвращает шаги, как draw_line_*.
+
+    Обходятся только шаги, видимые в окне pixel_clip_rect буфера.
+    """
+    rgb = to_rgb(color)
+    clip_rect = pixel_clip_rect(framebuffer.width, framebuffer.height, algorithm)
+    if algorithm == "Wu":
+        table = _blend_cache.table(rgb, framebuffer.background)
+        top = len(table) - 1
+
+        def plot_intensity(px, py, intensity, base_color):
+            framebuffer.set_pixel(px, py, table[max(0, min(top, int(intensity * top + 0.5)))])
+
+        return rasterize_wu(x1, y1, x2, y2, rgb, plot_intensity, collect_steps, clip_rect)
+
+    if algorithm == "Bresenham" and not collect_steps:
+        for xa, ya, xb, yb in iter_bresenham_runs(x1, y1, x2, y2, clip_rect):
+            if ya == yb:
+                framebuffer.fill_hspan(ya, xa, xb, rgb)
+            else:
+                framebuffer.fill_vspan(xa, ya, yb, rgb)
+        return []
+
+    rasterizer = RASTERIZERS.get(algorithm)
+    if rasterizer is None:
+        raise ValueError(f"Неизвестный алгоритм: {algorithm}")
+    return rasterizer(x1, y1, x2, y2, rgb, lambda px, py, c: framebuffer.set_pixel(px, py, c), collect_steps, clip_rect)
+
+
+def render_lines(width, height, segments, algorithm="DDA", color=(0, 0, 0), background=(255, 255, 255)):
+    """Рисует набор отрезков в новый буфер кадра без участия Tk."""
+    framebuffer = FrameBuffer(width, height, background)
+    for x1, y1, x2, y2 in segments:
+        render_line(framebuffer, algorithm, x1, y1, x2, y2, color)
+    return framebuffer